@@ -1,8 +1,16 @@
 from __future__ import annotations
 
+import bisect
+import heapq
 import unittest
+from dataclasses import FrozenInstanceError, dataclass
 from datetime import datetime, timedelta
 
+import numpy as np
+
+from exercise.s3.ressource.quote_block import QuoteBlock
+from exercise.s3.ressource.quote_ring_buffer import QuoteRingBuffer
+
 
 class NegativePriceException(Exception):
     def __init__(self, quote: "Quote"):
@@ -32,12 +40,22 @@ class Quote:
     def __repr__(self):
         return f"Quote(date={self.date!r}, price={self.price!r})"
 
+
+@dataclass(slots=True, frozen=True)
+class SlottedQuote:
+    """Immutable, slotted variant of Quote, usable wherever FinancialAsset expects a Quote."""
+    date: datetime
+    price: float
+
+
 class FinancialAsset:
-    def __init__(self, ticker, quote, currency):
+    def __init__(self, ticker, quote, currency, history_capacity: int = None):
         self.ticker: str = ticker
         self.last_quote: Quote = quote
         self.currency: str = currency
-        self.history: [Quote] = []
+        self.history: [Quote] = [] if history_capacity is None else QuoteRingBuffer(history_capacity, quote_cls=Quote)
+        self.rejected_quotes: QuoteBlock = QuoteBlock()
+        self.quote_stats: dict = {"accepted": 0, "late": 0, "rejected": 0}
 
 
     def update_last_quote(self, new_quote: Quote):
@@ -50,10 +68,70 @@ class FinancialAsset:
             print("Quote has not been updated")
         except EarlierQuoteDateException as date_exception:
             print(date_exception)
-            self.history.append(new_quote)
+            self.__insert_late_quote(new_quote)
         finally:
             pass
 
+    def update_quotes(self, quotes) -> dict:
+        """
+        Batch version of update_last_quote for noisy feeds, without raising, catching or printing per quote.
+        quotes is a QuoteBlock (or a structured array with QUOTE_DTYPE) in feed order. The checks are vectorized:
+            - negative prices are rejected and stored in rejected_quotes,
+            - quotes earlier than the last quote known at their arrival are merged into the history,
+            - the other quotes are applied in order, the last one becoming last_quote.
+        Returns the counts for this batch, cumulative counts are kept in quote_stats.
+        """
+        block = quotes if isinstance(quotes, QuoteBlock) else QuoteBlock(quotes)
+        dates, prices = block.dates, block.prices
+        negative = prices < 0
+
+        last_date = np.datetime64(self.last_quote.date, 'us')
+        candidate_dates = np.where(negative, last_date, dates)
+        last_date_at_arrival = np.maximum.accumulate(np.concatenate([[last_date], candidate_dates]))[:-1]
+        late = ~negative & (dates < last_date_at_arrival)
+        accepted = ~negative & ~late
+
+        accepted_quotes = block[accepted].to_quotes(Quote)
+        if accepted_quotes:
+            for quote in [self.last_quote] + accepted_quotes[:-1]:
+                self.history.append(quote)
+            self.last_quote = accepted_quotes[-1]
+        if late.any():
+            self.merge_late_quotes(block[late].to_quotes(Quote))
+        if negative.any():
+            self.rejected_quotes = QuoteBlock.concatenate([self.rejected_quotes, block[negative]])
+
+        batch_stats = {"accepted": int(accepted.sum()), "late": int(late.sum()), "rejected": int(negative.sum())}
+        for key, count in batch_stats.items():
+            self.quote_stats[key] += count
+        return batch_stats
+
+    def merge_late_quotes(self, late_quotes: [Quote]):
+        """
+        Merge a burst of late quotes into the history in one pass (sort the burst, then merge two sorted sequences)
+        instead of one insertion per quote. The history stays sorted by date and last_quote is not updated.
+        """
+        late_quotes = sorted(late_quotes, key=lambda quote: quote.date)
+        if isinstance(self.history, QuoteRingBuffer):
+            self.history.insert_many(late_quotes)
+        else:
+            self.history = list(heapq.merge(self.history, late_quotes, key=lambda quote: quote.date))
+
+    def quote_as_of(self, date: datetime):
+        """Last known quote at date, O(log n) thanks to the sorted history. None if date is before the history."""
+        if date >= self.last_quote.date:
+            return self.last_quote
+        if isinstance(self.history, QuoteRingBuffer):
+            return self.history.as_of(date)
+        position = bisect.bisect_right(self.history, date, key=lambda quote: quote.date)
+        return self.history[position - 1] if position else None
+
+    def __insert_late_quote(self, late_quote: Quote):
+        if isinstance(self.history, QuoteRingBuffer):
+            self.history.insert(late_quote)
+        else:
+            bisect.insort_right(self.history, late_quote, key=lambda quote: quote.date)
+
 
     def __check_quote_for_asset(self, new_quote: Quote):
         if new_quote.price < 0:
@@ -100,6 +178,64 @@ class TestFinancialAsset(unittest.TestCase):
         self.assertEqual(len(self.asset.history), 1)
         self.assertEqual(self.asset.history[-1], last_quote_before_update)
 
+    def test_slotted_quote_is_frozen_and_has_no_dict(self):
+        quote = SlottedQuote(date=self.base_time + timedelta(hours=1), price=190.0)
+
+        self.assertFalse(hasattr(quote, "__dict__"))
+        with self.assertRaises(FrozenInstanceError):
+            quote.price = 200.0
+
+        self.asset.update_last_quote(quote)
+        self.assertIs(self.asset.last_quote, quote)
+
+    def test_bounded_history_keeps_only_the_most_recent_quotes(self):
+        asset = FinancialAsset("AAPL", self.base_quote, "USD", history_capacity=3)
+        for hour in range(1, 6):
+            asset.update_last_quote(Quote(date=self.base_time + timedelta(hours=hour), price=175.0 + hour))
+
+        self.assertEqual(len(asset.history), 3)
+        self.assertEqual([quote.price for quote in asset.history], [177.0, 178.0, 179.0])
+        self.assertEqual(asset.last_quote.price, 180.0)
+
+        asset.update_last_quote(Quote(date=self.base_time + timedelta(hours=2, minutes=30), price=1.0))
+        self.assertEqual([quote.price for quote in asset.history], [1.0, 178.0, 179.0])
+
+    def test_late_quotes_are_inserted_in_date_order(self):
+        for hour in (1, 2, 3):
+            self.asset.update_last_quote(Quote(date=self.base_time + timedelta(hours=hour), price=175.0 + hour))
+        self.asset.update_last_quote(Quote(date=self.base_time + timedelta(hours=1, minutes=30), price=1.0))
+        self.asset.merge_late_quotes([Quote(date=self.base_time + timedelta(hours=2, minutes=30), price=3.0),
+                                      Quote(date=self.base_time - timedelta(hours=1), price=2.0)])
+
+        dates = [quote.date for quote in self.asset.history]
+        self.assertEqual(dates, sorted(dates))
+        self.assertEqual([quote.price for quote in self.asset.history], [2.0, 175.0, 176.0, 1.0, 177.0, 3.0])
+        self.assertEqual(self.asset.last_quote.price, 178.0)
+
+    def test_quote_as_of(self):
+        for hour in (1, 2):
+            self.asset.update_last_quote(Quote(date=self.base_time + timedelta(hours=hour), price=175.0 + hour))
+
+        self.assertIsNone(self.asset.quote_as_of(self.base_time - timedelta(minutes=1)))
+        self.assertEqual(self.asset.quote_as_of(self.base_time + timedelta(minutes=59)).price, 175.0)
+        self.assertEqual(self.asset.quote_as_of(self.base_time + timedelta(hours=1)).price, 176.0)
+        self.assertEqual(self.asset.quote_as_of(self.base_time + timedelta(days=1)).price, 177.0)
+
+    def test_batch_update_classifies_quotes_without_exceptions(self):
+        hour = timedelta(hours=1)
+        block = QuoteBlock.from_arrays(
+            [self.base_time + hour, self.base_time - hour, self.base_time + 2 * hour, self.base_time + 3 * hour,
+             self.base_time + 2.5 * hour],
+            [176.0, 174.0, -1.0, 178.0, 177.5])
+
+        stats = self.asset.update_quotes(block)
+
+        self.assertEqual(stats, {"accepted": 2, "late": 2, "rejected": 1})
+        self.assertEqual(self.asset.quote_stats, stats)
+        self.assertEqual(self.asset.last_quote.price, 178.0)
+        self.assertEqual([quote.price for quote in self.asset.history], [174.0, 175.0, 176.0, 177.5])
+        self.assertEqual(self.asset.rejected_quotes.prices.tolist(), [-1.0])
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -15,6 +15,7 @@ Tips:
     that are not handle yet.
 """
 
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import math
@@ -22,6 +23,7 @@ import math
 from exercise.s3.ressource.quote import Quote
 from exercise.s3.ressource.instrument import Instrument
 from exercise.s3.ressource.position import Position
+from exercise.s3.ressource.quote_index import QuoteIndex
 
 """
 PART I: Creating the meta class strategy and one specific strategy:
@@ -94,8 +96,80 @@ Portfolio Summary: Implement the portfolio_position_summary method. This method
     and last close for the assets
 """
 
+"""
+Part III : Transaction costs and cash accounting
+Replacing positions without computing the trades hides turnover, commissions and slippage, so the NAV is overstated.
+At each rebalance we compute the trades in bulk (new quantities minus old quantities) and price them with a pluggable
+cost model. A cost model receives the tickers, the array of traded quantities and the array of execution prices and
+returns an array of costs (one per asset), so every step of the rebalance is a NumPy array operation.
+"""
+
+class CostModel(ABC):
+    @abstractmethod
+    def compute_costs(self, tickers: list[str], trades: np.ndarray, prices: np.ndarray) -> np.ndarray:
+        """
+
+        :param tickers: tickers of the traded assets, aligned with trades and prices
+        :param trades: traded quantities (positive for buy, negative for sell)
+        :param prices: execution prices
+        :return: array of transaction costs in portfolio currency, one per asset
+        """
+        pass
+
+    @staticmethod
+    def _per_ticker(values, tickers: list[str], default: float) -> np.ndarray:
+        if isinstance(values, dict):
+            return np.array([values.get(ticker, default) for ticker in tickers], dtype=float)
+        return np.full(len(tickers), values, dtype=float)
+
+
+class FixedBpsCostModel(CostModel):
+    """Commission proportional to the traded notional: cost = |trade| * price * bps / 10 000."""
+    def __init__(self, bps: float):
+        if bps < 0:
+            raise ValueError("bps must be >= 0")
+        self.bps = bps
+
+    def compute_costs(self, tickers: list[str], trades: np.ndarray, prices: np.ndarray) -> np.ndarray:
+        return np.abs(trades) * prices * self.bps / 10_000
+
+
+class SpreadCostModel(CostModel):
+    """
+    Cost of crossing half of the bid/ask spread: cost = |trade| * price * spread_bps / 2 / 10 000.
+    spread_bps can be a single value or a dict with tickers as keys (default_spread_bps is used for missing tickers).
+    """
+    def __init__(self, spread_bps, default_spread_bps: float = 0.):
+        self.spread_bps = spread_bps
+        self.default_spread_bps = default_spread_bps
+
+    def compute_costs(self, tickers: list[str], trades: np.ndarray, prices: np.ndarray) -> np.ndarray:
+        spreads = self._per_ticker(self.spread_bps, tickers, self.default_spread_bps)
+        return np.abs(trades) * prices * spreads / 2 / 10_000
+
+
+class SquareRootImpactCostModel(CostModel):
+    """
+    Square-root market impact: cost = |trade| * price * coefficient * volatility * sqrt(|trade| / daily_volume).
+    volatility (daily) and daily_volume (in shares) are dicts with tickers as keys, a missing volume means no impact.
+    """
+    def __init__(self, volatility: dict, daily_volume: dict, coefficient: float = 1.):
+        self.volatility = volatility
+        self.daily_volume = daily_volume
+        self.coefficient = coefficient
+
+    def compute_costs(self, tickers: list[str], trades: np.ndarray, prices: np.ndarray) -> np.ndarray:
+        vol = self._per_ticker(self.volatility, tickers, 0.)
+        adv = self._per_ticker(self.daily_volume, tickers, np.inf)
+        participation = np.divide(np.abs(trades), adv, out=np.zeros(len(tickers)), where=adv > 0)
+        return np.abs(trades) * prices * self.coefficient * vol * np.sqrt(participation)
+
+
 class Portfolio():
-    def __init__(self, name: str, currency: str, aum: float, nav: float, strategy: Strategy):
+    MAX_SIZING_ITERATIONS = 10
+
+    def __init__(self, name: str, currency: str, aum: float, nav: float, strategy: Strategy,
+                 cost_model: CostModel = None):
         self.name = name
         self.currency = currency
         self.aum = aum
@@ -104,6 +178,13 @@ class Portfolio():
         self.position: [Position] = []
         self.historical_position: dict = {}
         self.strategy = strategy
+        self.cost_model = cost_model
+        # aum is the capital invested at the first rebalance (the positions are sized from it), nav is only the last
+        # value computed, so the cash account starts from aum. After the first rebalance nav = cash + positions.
+        self.cash = aum
+        self.historical_trades: dict = {}
+        self.historical_costs: dict = {}
+        self.historical_turnover: dict = {}
 
     def initialize_position_from_instrument_list(self, instrument_list: [Instrument]):
         self.position = [Position(inst) for inst in instrument_list]
@@ -114,15 +195,53 @@ class Portfolio():
     def rebalance_portfolio(self, rebalancing_date : datetime = datetime.today()):
         dict_for_signal = self._positions_to_dict()
         signal = self.strategy.generate_signals(dict_for_signal)
-        new_position = [Position(pos.instrument,
-                                 rebalancing_date,
-                                 signal.get(pos.instrument.ticker),
-                                 math.floor((self.aum * signal.get(pos.instrument.ticker))/pos.instrument.last_quote.price))
-                        for pos in self.position]
+
+        tickers = [pos.instrument.ticker for pos in self.position]
+        prices = np.array([pos.instrument.last_quote.price for pos in self.position], dtype=float)
+        old_quantities = np.array([pos.quantity for pos in self.position], dtype=float)
+        weights = np.array([signal.get(ticker) for ticker in tickers], dtype=float)
+
+        # the targets are sized from the current NAV (the PnL is reinvested) net of the estimated transaction costs:
+        # the costs of the trades are estimated and removed from the investable amount until the cash stays >= 0
+        nav_before = self.cash + old_quantities @ prices
+        investable = nav_before
+        for _ in range(self.MAX_SIZING_ITERATIONS):
+            new_quantities = np.floor(np.maximum(investable, 0.) * weights / prices)
+            trades = new_quantities - old_quantities
+            costs = self._compute_costs(tickers, trades, prices)
+            cash_after = nav_before - new_quantities @ prices - costs.sum()
+            if cash_after >= 0:
+                break
+            investable += cash_after
+        new_quantities = new_quantities.astype(np.int64)
+        traded_notional = np.abs(trades) * prices
+
+        self.cash = cash_after
+        self.nav = self.cash + new_quantities @ prices
+
+        new_position = [Position(pos.instrument, rebalancing_date, weight, int(qty))
+                        for pos, weight, qty in zip(self.position, weights.tolist(), new_quantities)]
         self.position = new_position
         self.historical_position[rebalancing_date] = new_position
-
-
+        self.historical_nav[rebalancing_date] = self.nav
+        self.historical_trades[rebalancing_date] = dict(zip(tickers, trades.tolist()))
+        self.historical_costs[rebalancing_date] = float(costs.sum())
+        self.historical_turnover[rebalancing_date] = (float(traded_notional.sum() / nav_before)
+                                                      if nav_before else 0.)
+
+    def _compute_costs(self, tickers: list[str], trades: np.ndarray, prices: np.ndarray) -> np.ndarray:
+        if self.cost_model is None:
+            return np.zeros(len(tickers))
+        return self.cost_model.compute_costs(tickers, trades, prices)
+
+    def mark_to_market(self, calendar) -> pd.Series:
+        """
+        NAV of the current positions and cash on each date of the calendar, the instruments being aligned on the
+        calendar with one as-of join (price known at each date).
+        """
+        prices = QuoteIndex.as_of_join([pos.instrument for pos in self.position], calendar)
+        quantities = np.array([pos.quantity for pos in self.position], dtype=float)
+        return pd.Series(self.cash + prices.to_numpy() @ quantities, index=prices.index, name="NAV")
 
     def portfolio_position_summary(self):
         ticker = [pos.instrument.ticker for pos in self.position]
@@ -226,6 +345,85 @@ class TestPortfolio(unittest.TestCase):
 
         pd.testing.assert_frame_equal(summary, expected_df)
 
+class TestPortfolioTransactionCosts(unittest.TestCase):
+    def setUp(self):
+        self.equity_1 = Instrument('AAPL', 'NASDAQ', Quote(datetime(2025, 8, 29), 200.), 'USD')
+        self.equity_2 = Instrument('MSFT', 'NASDAQ', Quote(datetime(2025, 8, 29), 400.), 'USD')
+        self.instruments = [self.equity_1, self.equity_2]
+
+    def _portfolio(self, cost_model=None):
+        portfolio = Portfolio("Tech Portfolio", "USD", 100000, 100000, EqualWeightStrategy(), cost_model)
+        portfolio.initialize_position_from_instrument_list(self.instruments)
+        return portfolio
+
+    def test_cost_free_rebalance_keeps_nav(self):
+        portfolio = self._portfolio()
+        portfolio.rebalance_portfolio(datetime(2025, 8, 30))
+
+        self.assertAlmostEqual(portfolio.nav, 100000)
+        self.assertAlmostEqual(portfolio.cash, 0.)
+        self.assertEqual(portfolio.historical_trades[datetime(2025, 8, 30)], {'AAPL': 250., 'MSFT': 125.})
+        self.assertAlmostEqual(portfolio.historical_turnover[datetime(2025, 8, 30)], 1.)
+
+    def test_fixed_bps_costs_are_paid_from_the_invested_amount(self):
+        portfolio = self._portfolio(FixedBpsCostModel(bps=10))
+        portfolio.rebalance_portfolio(datetime(2025, 8, 30))
+
+        # 100 of estimated costs are kept aside: 99 900 / 2 is invested in each asset
+        self.assertEqual(portfolio.historical_trades[datetime(2025, 8, 30)], {'AAPL': 249., 'MSFT': 124.})
+        self.assertAlmostEqual(portfolio.historical_costs[datetime(2025, 8, 30)], 99.4)
+        self.assertAlmostEqual(portfolio.cash, 500.6)
+        self.assertAlmostEqual(portfolio.nav, 100000 - 99.4)
+
+    def test_pnl_is_reinvested_and_only_the_trades_are_charged(self):
+        portfolio = self._portfolio(FixedBpsCostModel(bps=10))
+        portfolio.rebalance_portfolio(datetime(2025, 8, 30))
+        self.equity_1.update_price(Quote(datetime(2025, 8, 31), 250.))
+        nav_before = portfolio.cash + 249 * 250. + 124 * 400.
+        portfolio.rebalance_portfolio(datetime(2025, 8, 31))
+
+        trades = portfolio.historical_trades[datetime(2025, 8, 31)]
+        self.assertEqual(trades, {'AAPL': -25., 'MSFT': 16.})
+        self.assertAlmostEqual(portfolio.historical_costs[datetime(2025, 8, 31)], (25 * 250. + 16 * 400.) / 1000)
+        self.assertGreaterEqual(portfolio.cash, 0.)
+        self.assertLess(portfolio.cash, 400.)  # only the rounding of the quantities stays in cash
+        self.assertAlmostEqual(portfolio.nav, nav_before - portfolio.historical_costs[datetime(2025, 8, 31)])
+
+    def test_costs_never_overdraw_the_cash(self):
+        impact = SquareRootImpactCostModel(volatility={'AAPL': 0.5, 'MSFT': 0.5},
+                                           daily_volume={'AAPL': 100., 'MSFT': 100.})
+        portfolio = self._portfolio(impact)
+        portfolio.rebalance_portfolio(datetime(2025, 8, 30))
+        self.assertGreaterEqual(portfolio.cash, 0.)
+
+    def test_spread_and_square_root_impact_costs(self):
+        tickers = ['AAPL', 'MSFT']
+        trades = np.array([100., -400.])
+        prices = np.array([200., 400.])
+
+        spread_costs = SpreadCostModel({'AAPL': 4.}, default_spread_bps=2.).compute_costs(tickers, trades, prices)
+        np.testing.assert_allclose(spread_costs, [4., 16.])
+
+        impact = SquareRootImpactCostModel(volatility={'AAPL': 0.02, 'MSFT': 0.01},
+                                           daily_volume={'AAPL': 10000.})
+        np.testing.assert_allclose(impact.compute_costs(tickers, trades, prices), [40., 0.])
+
+
+class TestPortfolioMarkToMarket(unittest.TestCase):
+    def test_mark_to_market_uses_price_as_of_each_date(self):
+        equity_1 = Instrument('AAPL', 'NASDAQ', Quote(datetime(2025, 8, 29), 200.), 'USD')
+        equity_2 = Instrument('MSFT', 'NASDAQ', Quote(datetime(2025, 8, 29), 400.), 'USD')
+        portfolio = Portfolio("Tech Portfolio", "USD", 100000, 100000, EqualWeightStrategy())
+        portfolio.initialize_position_from_instrument_list([equity_1, equity_2])
+        portfolio.rebalance_portfolio(datetime(2025, 8, 29))
+        equity_1.update_price(Quote(datetime(2025, 9, 1), 220.))
+        equity_2.update_price(Quote(datetime(2025, 9, 2), 380.))
+
+        self.assertEqual(equity_1.price_as_of(datetime(2025, 8, 31)), 200.)
+        nav = portfolio.mark_to_market([datetime(2025, 8, 29), datetime(2025, 9, 1), datetime(2025, 9, 3)])
+        np.testing.assert_allclose(nav.to_numpy(), [100000., 105000., 102500.])
+
+
 def run_tests():
     unittest.main(argv=[''], verbosity=2, exit=False)
 
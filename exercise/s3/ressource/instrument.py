@@ -1,33 +1,106 @@
+import unittest
+from datetime import datetime, timedelta
+
 import pandas as pd
 
 from exercise.s3.ressource.quote import Quote
+from exercise.s3.ressource.quote_index import QuoteIndex
+from exercise.s3.ressource.quote_ring_buffer import QuoteRingBuffer
 
 
 class Instrument:
-    def __init__(self, ticker: str, exchange: str, quote: Quote, currency: str):
+    def __init__(self, ticker: str, exchange: str, quote: Quote, currency: str, history_capacity: int = None,
+                 spill_dir: str = None):
         self.ticker: str = ticker
         self.exchange: str = exchange
         self.last_quote: Quote = quote
         self.currency: str = currency
-        self.quote_history: [Quote] = []
+        self.history_capacity = history_capacity
+        self.spill_dir = spill_dir
+        self.quote_history: [Quote] = self._new_quote_history()
+        self._quote_index: QuoteIndex = None
 
     def __str__(self):
         print(f'Instrument with ticker {self.ticker}, currency {self.currency} and last quote {self.last_quote}')
 
+    def _new_quote_history(self):
+        if self.history_capacity is None:
+            return []
+        return QuoteRingBuffer(self.history_capacity, spill_dir=self.spill_dir)
+
+    @property
+    def quote_index(self) -> QuoteIndex:
+        """Sorted-time index over quote_history and last_quote, rebuilt lazily after an update."""
+        if self._quote_index is None:
+            self._quote_index = QuoteIndex.from_instrument(self)
+        return self._quote_index
+
+    def price_as_of(self, date: datetime) -> float:
+        return self.quote_index.as_of(date)
+
     def update_price(self, new_quote: Quote):
-        self.quote_history.append(self.last_quote)
+        self._add_to_history(self.last_quote)
         self.last_quote = new_quote
+        self._quote_index = None
+
+    def _add_to_history(self, quote: Quote):
+        history = self.quote_history
+        if isinstance(history, QuoteRingBuffer) and len(history) and quote.date < history[-1].date:
+            history.insert(quote)  # the ring buffer only appends in time order, late quotes are inserted
+        else:
+            history.append(quote)
 
     def populate_quote_history_from_df(self, df_data: pd.DataFrame):
         dates = df_data.index.to_pydatetime().tolist()
         prices = df_data['Close'].tolist()
-        self.quote_history = [Quote(date, price) for date, price in zip(dates, prices)]
+        if self.history_capacity is None:
+            self.quote_history = [Quote(date, price) for date, price in zip(dates, prices)]
+        else:
+            self.quote_history = self._new_quote_history()
+            for date, price in zip(dates, prices):
+                self.quote_history.append(Quote(date, price))
+        self._quote_index = None
 
     def quotes_to_dataframe(self) -> pd.DataFrame:
-        data = {
-            "Date": [quote.date for quote in self.quote_history],
-            "Price": [quote.price for quote in self.quote_history]
-        }
+        if isinstance(self.quote_history, QuoteRingBuffer):
+            block = self.quote_history.to_block()
+            data = {"Date": block.dates, "Price": block.prices}
+        else:
+            data = {
+                "Date": [quote.date for quote in self.quote_history],
+                "Price": [quote.price for quote in self.quote_history]
+            }
         df = pd.DataFrame(data)
         df.set_index('Date', inplace=True)
         return df
+
+
+class TestInstrument(unittest.TestCase):
+    def setUp(self):
+        self.base_time = datetime(2024, 1, 10, 12, 0, 0)
+
+    def _updated_history(self, history_capacity):
+        instrument = Instrument("AAPL", "XNAS", Quote(self.base_time, 175.), "USD", history_capacity=history_capacity)
+        for hours, price in ((1, 176.), (-1, 1.), (2, 177.), (3, 178.)):  # the second quote is late
+            instrument.update_price(Quote(self.base_time + timedelta(hours=hours), price))
+        return instrument
+
+    def test_late_quote_with_bounded_history(self):
+        instrument = self._updated_history(history_capacity=10)
+        self.assertEqual([quote.price for quote in instrument.quote_history], [1., 175., 176., 177.])
+        self.assertEqual(instrument.last_quote.price, 178.)
+        self.assertEqual(instrument.price_as_of(self.base_time + timedelta(minutes=30)), 175.)
+
+    def test_bounded_history_accepts_the_same_feed_as_the_list(self):
+        unbounded = self._updated_history(history_capacity=None)
+        bounded = self._updated_history(history_capacity=3)
+        self.assertEqual(sorted(quote.price for quote in unbounded.quote_history)[-3:],
+                         [quote.price for quote in bounded.quote_history])
+
+
+def run_tests():
+    unittest.main(argv=[''], verbosity=2, exit=False)
+
+
+if __name__ == '__main__':
+    run_tests()
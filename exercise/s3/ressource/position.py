@@ -1,3 +1,4 @@
+from dataclasses import dataclass, field
 from datetime import datetime
 
 from exercise.s3.ressource.instrument import Instrument
@@ -16,4 +17,21 @@ class Position:
         if weight is not None:
             self.weight = weight
         if quantity is not None:
-            self.quantity = quantity
\ No newline at end of file
+            self.quantity = quantity
+
+
+@dataclass(slots=True)
+class SlottedPosition:
+    """Slotted variant of Position: same attributes and update method, no per-instance __dict__."""
+    instrument: Instrument
+    date: datetime = field(default_factory=datetime.now)
+    weight: float = 0.
+    quantity: float = 0.
+
+    def update(self, date: datetime, weight: float, quantity: float):
+        if date is not None:
+            self.date = date
+        if weight is not None:
+            self.weight = weight
+        if quantity is not None:
+            self.quantity = quantity
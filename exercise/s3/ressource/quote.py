@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from datetime import datetime
 
 
@@ -8,3 +9,13 @@ class Quote:
 
     def __str__(self):
         return f'(date: {self.date}, price: {self.price})'
+
+
+@dataclass(slots=True, frozen=True)
+class SlottedQuote:
+    """Immutable, slotted variant of Quote: no per-instance __dict__, for large quote histories."""
+    date: datetime
+    price: float
+
+    def __str__(self):
+        return f'(date: {self.date}, price: {self.price})'
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import numpy as np
+
+from exercise.s3.ressource.quote import Quote
+
+QUOTE_DTYPE = np.dtype([('date', 'datetime64[us]'), ('price', 'f8')])
+
+
+class QuoteBlock:
+    """
+    Bulk storage for quotes in a NumPy structured array (16 bytes per quote: one datetime64 and one float64).
+    Quote objects are only created when a single element is read back.
+    """
+    def __init__(self, data: np.ndarray = None):
+        if data is None:
+            data = np.empty(0, dtype=QUOTE_DTYPE)
+        if data.dtype != QUOTE_DTYPE:
+            raise ValueError(f"QuoteBlock data must have dtype {QUOTE_DTYPE}")
+        self.data = data
+
+    @classmethod
+    def from_arrays(cls, dates, prices):
+        dates = np.asarray(dates, dtype='datetime64[us]')
+        prices = np.asarray(prices, dtype=float)
+        if dates.shape != prices.shape:
+            raise ValueError("dates and prices must have the same length")
+        data = np.empty(len(dates), dtype=QUOTE_DTYPE)
+        data['date'] = dates
+        data['price'] = prices
+        return cls(data)
+
+    @classmethod
+    def from_quotes(cls, quotes):
+        quotes = list(quotes)
+        return cls.from_arrays([quote.date for quote in quotes], [quote.price for quote in quotes])
+
+    @classmethod
+    def concatenate(cls, blocks):
+        return cls(np.concatenate([block.data for block in blocks]))
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self.data['date']
+
+    @property
+    def prices(self) -> np.ndarray:
+        return self.data['price']
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def to_quotes(self, quote_cls=Quote) -> list:
+        return [quote_cls(date, price) for date, price in zip(self.dates.tolist(), self.prices.tolist())]
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, item):
+        if isinstance(item, (slice, np.ndarray)):
+            return QuoteBlock(self.data[item])
+        record = self.data[item]
+        date: datetime = record['date'].item()
+        return Quote(date, float(record['price']))
+
+    def __iter__(self):
+        return iter(self.to_quotes())
+
+    def __repr__(self):
+        return f"QuoteBlock(len={len(self)}, nbytes={self.nbytes})"
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from exercise.s3.ressource.quote_block import QuoteBlock
+from exercise.s3.ressource.quote_ring_buffer import QuoteRingBuffer
+
+
+class QuoteIndex:
+    """
+    Sorted-time index over a quote history: a datetime64 array and the aligned prices.
+    As-of and range lookups are binary searches (np.searchsorted) instead of scans of the quote list.
+    """
+    def __init__(self, dates, prices):
+        dates = np.asarray(dates, dtype='datetime64[us]')
+        prices = np.asarray(prices, dtype=float)
+        if dates.shape != prices.shape:
+            raise ValueError("dates and prices must have the same length")
+        if len(dates) > 1 and np.any(dates[1:] < dates[:-1]):
+            order = np.argsort(dates, kind='stable')
+            dates, prices = dates[order], prices[order]
+        self.dates = dates
+        self.prices = prices
+
+    @classmethod
+    def from_instrument(cls, instrument) -> "QuoteIndex":
+        """Index over the quote history of an Instrument, including its last quote."""
+        if isinstance(instrument.quote_history, QuoteRingBuffer):
+            block = instrument.quote_history.to_block()
+        else:
+            block = QuoteBlock.from_quotes(instrument.quote_history)
+        last = instrument.last_quote
+        return cls(np.append(block.dates, np.datetime64(last.date, 'us')), np.append(block.prices, last.price))
+
+    def __len__(self):
+        return len(self.dates)
+
+    def as_of(self, dates):
+        """
+        Price known at each date (last quote dated at or before it), NaN before the first quote.
+        Accepts a single date (returns a float) or an array of dates (returns an array).
+        """
+        query = np.asarray(dates, dtype='datetime64[us]')
+        positions = np.searchsorted(self.dates, query, side='right') - 1
+        prices = np.where(positions >= 0, self.prices[np.maximum(positions, 0)], np.nan) if len(self) \
+            else np.full(query.shape, np.nan)
+        return float(prices) if prices.ndim == 0 else prices
+
+    def range(self, start: datetime, end: datetime) -> QuoteBlock:
+        """Quotes with start <= date <= end."""
+        lo = np.searchsorted(self.dates, np.datetime64(start, 'us'), side='left')
+        hi = np.searchsorted(self.dates, np.datetime64(end, 'us'), side='right')
+        return QuoteBlock.from_arrays(self.dates[lo:hi], self.prices[lo:hi])
+
+    @staticmethod
+    def as_of_join(instruments, calendar) -> pd.DataFrame:
+        """
+        Align many instruments onto a common calendar: one as-of search per instrument over the whole calendar.
+        Returns a DataFrame with the calendar as index and the tickers as columns (NaN before the first quote).
+        """
+        calendar = np.asarray(calendar, dtype='datetime64[us]')
+        prices = np.empty((len(calendar), len(instruments)))
+        for column, instrument in enumerate(instruments):
+            prices[:, column] = instrument.quote_index.as_of(calendar)
+        return pd.DataFrame(prices, index=pd.DatetimeIndex(calendar, name='Date'),
+                            columns=[instrument.ticker for instrument in instruments])
@@ -0,0 +1,46 @@
+"""
+Memory benchmark: bytes per instance for the different quote / position representations.
+
+Run from the project root with : python -m exercise.s3.ressource.quote_memory_benchmark
+"""
+import sys
+from datetime import datetime
+
+from exercise.s3.corrected_version.cutom_error_corrected import (Quote as ValidatedQuote,
+                                                                 SlottedQuote as ValidatedSlottedQuote)
+from exercise.s3.ressource.instrument import Instrument
+from exercise.s3.ressource.position import Position, SlottedPosition
+from exercise.s3.ressource.quote import Quote, SlottedQuote
+from exercise.s3.ressource.quote_block import QuoteBlock
+
+
+def instance_size(obj) -> int:
+    """Size of the object itself plus its __dict__ when it has one (the attribute values are shared/excluded)."""
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def run_benchmark(n_quotes: int = 100_000):
+    date, price = datetime(2025, 8, 29), 230.02
+    instrument = Instrument('AAPL', 'NASDAQ', Quote(date, price), 'USD')
+
+    rows = [
+        ("Quote", instance_size(Quote(date, price))),
+        ("SlottedQuote", instance_size(SlottedQuote(date, price))),
+        ("cutom_error_corrected.Quote", instance_size(ValidatedQuote(date, price))),
+        ("cutom_error_corrected.SlottedQuote", instance_size(ValidatedSlottedQuote(date, price))),
+        ("Position", instance_size(Position(instrument, date, 0.25, 100))),
+        ("SlottedPosition", instance_size(SlottedPosition(instrument, date, 0.25, 100))),
+    ]
+    block = QuoteBlock.from_arrays([date] * n_quotes, [price] * n_quotes)
+    rows.append(("QuoteBlock (per quote)", block.nbytes // n_quotes))
+
+    for name, size in rows:
+        print(f"{name:<40} {size:>5} bytes per instance")
+    return dict(rows)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,213 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from exercise.s3.ressource.quote import Quote
+from exercise.s3.ressource.quote_block import QUOTE_DTYPE, QuoteBlock
+
+
+class QuoteRingBuffer:
+    """
+    Fixed-capacity, time-ordered history of the most recent quotes, backed by a NumPy structured array.
+
+    Appending is O(1): once the buffer is full the oldest quote is evicted. If spill_dir is provided, evicted quotes
+    are staged and written to disk by segments of segment_size quotes (.npy files), so the full history can still be
+    reloaded with spilled(). Quotes must be appended in time order, late quotes go through insert().
+    A late quote evicted by insert() can be earlier than quotes already written to disk, so the segments may overlap in
+    time: spilled() sorts them back into time order.
+    """
+    def __init__(self, capacity: int, spill_dir: str = None, segment_size: int = None, quote_cls=Quote):
+        if capacity <= 0:
+            raise ValueError("capacity must be > 0")
+        self.capacity = capacity
+        self.quote_cls = quote_cls
+        self._data = np.empty(capacity, dtype=QUOTE_DTYPE)
+        self._start = 0
+        self._size = 0
+
+        self.spill_dir = spill_dir
+        self._segment_size = segment_size or capacity
+        self._staging = np.empty(self._segment_size, dtype=QUOTE_DTYPE) if spill_dir is not None else None
+        self._n_staged = 0
+        self._segment_files = []
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return iter(self.to_block().to_quotes(self.quote_cls))
+
+    def __getitem__(self, item: int):
+        if not -self._size <= item < self._size:
+            raise IndexError("QuoteRingBuffer index out of range")
+        record = self._data[(self._start + item % self._size) % self.capacity]
+        return self.quote_cls(record['date'].item(), float(record['price']))
+
+    @property
+    def last_date(self):
+        if self._size == 0:
+            return None
+        return self._data[(self._start + self._size - 1) % self.capacity]['date']
+
+    def append(self, quote):
+        date = np.datetime64(quote.date, 'us')
+        if self._size and date < self.last_date:
+            raise ValueError(f"Quote dated {quote.date} is earlier than the last buffered quote, use insert()")
+        if self._size == self.capacity:
+            self._evict(self._data[self._start])
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+        else:
+            index = (self._start + self._size) % self.capacity
+            self._size += 1
+        self._data[index] = (date, quote.price)
+
+    def insert(self, quote):
+        """Insert a late quote at its time position (O(capacity)). If the buffer is full the oldest quote is evicted."""
+        self.insert_many([quote])
+
+    def insert_many(self, quotes):
+        """Merge a burst of (possibly unsorted) late quotes in one stable sort, evicting the oldest overflow."""
+        block = QuoteBlock.from_quotes(quotes)
+        ordered = np.concatenate([self.to_block().data, block.data])
+        ordered = ordered[np.argsort(ordered['date'], kind='stable')]
+        overflow = max(len(ordered) - self.capacity, 0)
+        if overflow and self._staging is not None:
+            # the evicted quotes can be earlier than the staged ones: merge them so that the staging stays sorted
+            evicted = np.concatenate([self._staging[:self._n_staged], ordered[:overflow]])
+            self._n_staged = 0
+            for record in evicted[np.argsort(evicted['date'], kind='stable')]:
+                self._evict(record)
+        ordered = ordered[overflow:]
+        self._size = len(ordered)
+        self._start = 0
+        self._data[:self._size] = ordered
+
+    def as_of(self, date: datetime):
+        """Last quote dated at or before date (binary search), None if every buffered quote is later."""
+        date = np.datetime64(date, 'us')
+        for part in reversed(self._parts()):
+            position = np.searchsorted(part['date'], date, side='right')
+            if position:
+                record = part[position - 1]
+                return self.quote_cls(record['date'].item(), float(record['price']))
+        return None
+
+    def last(self, n: int) -> QuoteBlock:
+        """The n most recent quotes in time order."""
+        n = min(n, self._size)
+        return self.to_block()[self._size - n:] if n else QuoteBlock()
+
+    def window(self, start: datetime, end: datetime) -> QuoteBlock:
+        """Quotes with start <= date <= end, in time order (binary search on the two contiguous parts)."""
+        start, end = np.datetime64(start, 'us'), np.datetime64(end, 'us')
+        parts = []
+        for part in self._parts():
+            lo = np.searchsorted(part['date'], start, side='left')
+            hi = np.searchsorted(part['date'], end, side='right')
+            parts.append(part[lo:hi])
+        return QuoteBlock(np.concatenate(parts)) if parts else QuoteBlock()
+
+    def to_block(self) -> QuoteBlock:
+        parts = self._parts()
+        return QuoteBlock(np.concatenate(parts)) if parts else QuoteBlock()
+
+    def flush(self):
+        """Write the staged evicted quotes to disk as a (possibly partial) segment."""
+        if self._staging is None or self._n_staged == 0:
+            return
+        path = os.path.join(self.spill_dir, f"quotes_segment_{len(self._segment_files):06d}.npy")
+        np.save(path, self._staging[:self._n_staged])
+        self._segment_files.append(path)
+        self._n_staged = 0
+
+    def spilled(self) -> QuoteBlock:
+        """All evicted quotes in time order: segments written on disk (memory-mapped) and the staged ones."""
+        if self._staging is None:
+            return QuoteBlock()
+        parts = [np.load(path, mmap_mode='r') for path in self._segment_files]
+        parts.append(self._staging[:self._n_staged])
+        spilled = np.concatenate(parts)
+        return QuoteBlock(spilled[np.argsort(spilled['date'], kind='stable')])
+
+    def _parts(self) -> list:
+        end = self._start + self._size
+        if end <= self.capacity:
+            return [self._data[self._start:end]] if self._size else []
+        return [self._data[self._start:], self._data[:end - self.capacity]]
+
+    def _evict(self, record):
+        if self._staging is None:
+            return
+        self._staging[self._n_staged] = record
+        self._n_staged += 1
+        if self._n_staged == self._segment_size:
+            self.flush()
+
+    def __repr__(self):
+        return f"QuoteRingBuffer(capacity={self.capacity}, len={self._size})"
+
+
+class TestQuoteRingBuffer(unittest.TestCase):
+    def setUp(self):
+        self.base_time = datetime(2024, 1, 1)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def _quote(self, days: float, price: float = None) -> Quote:
+        return Quote(self.base_time + timedelta(days=days), float(days) if price is None else price)
+
+    def test_append_evicts_the_oldest_quotes(self):
+        buffer = QuoteRingBuffer(3)
+        for day in range(5):
+            buffer.append(self._quote(day))
+        self.assertEqual([quote.price for quote in buffer], [2., 3., 4.])
+        self.assertEqual(buffer[-1].price, 4.)
+        with self.assertRaises(ValueError):
+            buffer.append(self._quote(1))
+
+    def test_last_and_window(self):
+        buffer = QuoteRingBuffer(4)
+        for day in range(6):  # the data wraps around the end of the array
+            buffer.append(self._quote(day))
+        self.assertEqual(buffer.last(2).prices.tolist(), [4., 5.])
+        self.assertEqual(buffer.last(10).prices.tolist(), [2., 3., 4., 5.])
+        self.assertEqual(len(buffer.last(0)), 0)
+        self.assertEqual(buffer.window(self._quote(3).date, self._quote(4.5).date).prices.tolist(), [3., 4.])
+        self.assertEqual(len(buffer.window(self._quote(10).date, self._quote(11).date)), 0)
+        self.assertEqual(buffer.as_of(self._quote(3.5).date).price, 3.)
+
+    def test_evicted_quotes_are_spilled_to_disk(self):
+        buffer = QuoteRingBuffer(2, spill_dir=self.directory.name, segment_size=2)
+        for day in range(7):
+            buffer.append(self._quote(day))
+        self.assertEqual(len(os.listdir(self.directory.name)), 2)  # 5 evicted quotes: 2 full segments, 1 staged
+        buffer.flush()
+        self.assertEqual(len(os.listdir(self.directory.name)), 3)
+        self.assertEqual(buffer.spilled().prices.tolist(), [0., 1., 2., 3., 4.])
+        buffer.flush()  # nothing staged, no empty segment
+        self.assertEqual(len(os.listdir(self.directory.name)), 3)
+
+    def test_spilled_quotes_stay_in_time_order_after_a_late_insert(self):
+        buffer = QuoteRingBuffer(2, spill_dir=self.directory.name, segment_size=2)
+        for day in range(1, 6):
+            buffer.append(self._quote(day))
+        buffer.insert(self._quote(0.5))
+        buffer.insert_many([self._quote(2.5), self._quote(0.25)])
+        spilled = buffer.spilled()
+        self.assertEqual(spilled.prices.tolist(), [0.25, 0.5, 1., 2., 2.5, 3.])
+        self.assertTrue((np.diff(spilled.dates.astype('int64')) >= 0).all())
+        self.assertEqual([quote.price for quote in buffer], [4., 5.])
+
+
+def run_tests():
+    unittest.main(argv=[''], verbosity=2, exit=False)
+
+
+if __name__ == '__main__':
+    run_tests()
@@ -0,0 +1,125 @@
+"""
+EXERCISE 1 — From print-checks to unit tests
+
+Task:
+1) Run this script once as-is and look at the printed output.
+2) Create a test class `TestCompoundInterest` that converts the ad-hoc print
+   checks into proper unit tests using Python's `unittest`.
+3) Add a couple of case tests (zero periods, zero rate, negative period). make negative periods raise ValueError
+    and test for it.
+    What to verify:
+    - Nominal case 1000 @ 5% for 2 periods -> 1102.5
+    - Zero periods returns the principal
+    - Zero rate leaves amount unchanged
+    - Input validation raises ValueError for negative principal/periods and non-integer periods
+
+4) Add the possibility to run all test in the class when running the script.
+    To do so create a function run_tests() and call it under the __name__ == "__main__"
+
+Corrected version: compound_amount also accepts NumPy arrays (broadcast against each other) and continuous
+compounding, compound_amount_with_rate_curve compounds with a term structure of per-period rates.
+"""
+
+import unittest
+
+import numpy as np
+
+
+def compound_amount(principal, rate, periods, continuous=False):
+    """
+    Discrete compounding (or continuous compounding with continuous=True).
+    principal: float >= 0
+    rate: per-period rate as decimal (e.g., 0.05 for 5%)
+    periods: non-negative integer (non-negative number of periods for continuous compounding)
+
+    Each argument can also be a NumPy array: inputs are broadcast against each other
+    (e.g. principals[:, None, None], rates[None, :, None], periods[None, None, :]) and validated with one mask check.
+    Returns a float for scalar inputs, an array otherwise.
+    """
+    principal, rate, periods = np.asarray(principal, dtype=float), np.asarray(rate, dtype=float), np.asarray(periods)
+    if np.any(principal < 0):
+        raise ValueError("principal must be >= 0")
+    if np.any(periods < 0) or (not continuous and np.any(periods.astype(int) != periods)):
+        raise ValueError("periods must be a non-negative integer")
+    if continuous:
+        amount = principal * np.exp(rate * periods)
+    else:
+        amount = principal * (1 + rate) ** periods
+    return float(amount) if amount.ndim == 0 else amount
+
+
+def compound_amount_with_rate_curve(principal, rate_curve, periods, continuous=False):
+    """
+    Compounding with a term structure of per-period rates: rate_curve[t] applies to period t.
+    The growth factors of every horizon are computed once with a cumulative product (cumulative sum of the rates
+    for continuous compounding), then looked up for each requested number of periods.
+    principal: float or array >= 0
+    rate_curve: 1-D array of per-period rates
+    periods: non-negative integer(s), at most len(rate_curve), broadcast against principal
+    """
+    principal, rate_curve, periods = (np.asarray(principal, dtype=float), np.asarray(rate_curve, dtype=float),
+                                      np.asarray(periods))
+    if rate_curve.ndim != 1:
+        raise ValueError("rate_curve must be a 1-D array of per-period rates")
+    if np.any(principal < 0):
+        raise ValueError("principal must be >= 0")
+    if np.any(periods < 0) or np.any(periods.astype(int) != periods) or np.any(periods > len(rate_curve)):
+        raise ValueError("periods must be a non-negative integer lower or equal to the length of rate_curve")
+    if continuous:
+        growth = np.exp(np.concatenate(([0.], np.cumsum(rate_curve))))
+    else:
+        growth = np.concatenate(([1.], np.cumprod(1 + rate_curve)))
+    amount = principal * growth[periods.astype(int)]
+    return float(amount) if amount.ndim == 0 else amount
+
+
+class TestCompoundInterest(unittest.TestCase):
+    def test_nominal_case(self):
+        self.assertAlmostEqual(compound_amount(1000, 0.05, 2), 1102.5)
+
+    def test_zero_periods_returns_principal(self):
+        self.assertEqual(compound_amount(1000, 0.05, 0), 1000)
+
+    def test_zero_rate_leaves_amount_unchanged(self):
+        self.assertEqual(compound_amount(1000, 0., 10), 1000)
+
+    def test_invalid_inputs_raise_value_error(self):
+        with self.assertRaises(ValueError):
+            compound_amount(-1000, 0.05, 2)
+        with self.assertRaises(ValueError):
+            compound_amount(1000, 0.05, -1)
+        with self.assertRaises(ValueError):
+            compound_amount(1000, 0.05, 1.5)
+        with self.assertRaises(ValueError):
+            compound_amount(np.array([1000., -1.]), 0.05, 2)
+
+    def test_broadcasting_principals_rates_periods(self):
+        principals = np.array([1000., 2000.])
+        rates = np.array([0., 0.05])
+        periods = np.array([0, 2])
+        amounts = compound_amount(principals[:, None, None], rates[None, :, None], periods[None, None, :])
+
+        self.assertEqual(amounts.shape, (2, 2, 2))
+        np.testing.assert_allclose(amounts[1, 1], [2000., 2205.])
+        np.testing.assert_allclose(amounts[0, 0], [1000., 1000.])
+
+    def test_continuous_compounding(self):
+        self.assertAlmostEqual(compound_amount(1000, 0.05, 2, continuous=True), 1000 * np.exp(0.1))
+
+    def test_rate_curve(self):
+        curve = np.array([0.01, 0.02, 0.03])
+        amounts = compound_amount_with_rate_curve(np.array([100., 200.]), curve, np.array([3, 1]))
+        np.testing.assert_allclose(amounts, [100 * 1.01 * 1.02 * 1.03, 200 * 1.01])
+        self.assertAlmostEqual(compound_amount_with_rate_curve(100, curve, 2, continuous=True), 100 * np.exp(0.03))
+        with self.assertRaises(ValueError):
+            compound_amount_with_rate_curve(100, curve, 4)
+
+
+def run_tests():
+    unittest.main(argv=[''], verbosity=2, exit=False)
+
+
+if __name__ == "__main__":
+    amt = compound_amount(1000, 0.05, 2)
+    print("Expected ~1102.5, got:", amt)
+    run_tests()
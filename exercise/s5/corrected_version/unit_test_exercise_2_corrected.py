@@ -0,0 +1,109 @@
+"""
+EXERCISE 2 — Returns & Annualized Volatility
+
+Goal:
+Implement the function and then write the unit test TestLogReturn
+
+TestLogReturn
+    - test a valid case (for example : prices = np.array([100.0, 110.0, 121.0])
+    - test a nan case (for example : prices = np.array([100.0, 110.0, 121.0])
+    - test a negative case (for example : prices = np.array([100.0, 110.0, 121.0])
+
+    You can check the output for each case by running the script after the implementation of the function
+
+Corrected version: log_returns is vectorized, streaming_log_returns computes the returns chunk by chunk.
+"""
+import unittest
+
+import numpy as np
+
+
+def _validate_prices(prices: np.ndarray):
+    if np.any(prices <= 0):
+        raise ValueError("prices must be > 0 (NaN allowed for missing values)")
+
+
+def log_returns(prices:[]):
+    """
+    - Validate there are a minimum of 2 items and each items in the list are numbers.
+    - If any entry is <= 0 (and not NaN), raise ValueError.
+    - Return log(prices[i+1]/prices[i]), NaN where one of the two prices is NaN.
+
+    The computation is vectorized: one mask check for the validation and one array division, the NaN propagating
+    naturally to the returns around a missing price.
+    """
+    try:
+        prices = np.asarray(prices, dtype=float)
+    except (TypeError, ValueError):
+        raise TypeError("prices must only contain numbers") from None
+    if prices.ndim != 1 or len(prices) < 2:
+        raise ValueError("prices must contain at least 2 items")
+    _validate_prices(prices)
+    return np.log(prices[1:] / prices[:-1])
+
+
+def streaming_log_returns(price_chunks):
+    """
+    Log returns over a stream of price chunks (e.g. a tick file read by blocks), without loading the whole series.
+    The last price of each chunk is carried to the next one, so the concatenated output equals
+    log_returns(all prices). Yields one array of returns per chunk.
+    """
+    last_price = None
+    for chunk in price_chunks:
+        chunk = np.asarray(chunk, dtype=float)
+        if len(chunk) == 0:
+            continue
+        _validate_prices(chunk)
+        prices = chunk if last_price is None else np.concatenate(([last_price], chunk))
+        last_price = chunk[-1]
+        yield np.log(prices[1:] / prices[:-1])
+
+
+class TestLogReturn(unittest.TestCase):
+    def test_valid_case(self):
+        r = log_returns(np.array([100.0, 110.0, 121.0]))
+        np.testing.assert_allclose(r, [np.log(1.1), np.log(1.1)])
+
+    def test_nan_case(self):
+        r = log_returns(np.array([100.0, np.nan, 105.0, 110.25]))
+        self.assertTrue(np.isnan(r[0]) and np.isnan(r[1]))
+        self.assertAlmostEqual(r[2], np.log(1.05))
+
+    def test_negative_case(self):
+        with self.assertRaises(ValueError):
+            log_returns(np.array([100.0, -5.0, 105.0]))
+
+    def test_too_short_case(self):
+        with self.assertRaises(ValueError):
+            log_returns([100.0])
+
+    def test_streaming_matches_whole_series(self):
+        prices = np.array([100.0, 101.0, np.nan, 103.0, 104.0, 102.0, 105.0])
+        chunks = [prices[:2], prices[2:3], prices[3:6], prices[6:]]
+        streamed = np.concatenate(list(streaming_log_returns(chunks)))
+        np.testing.assert_allclose(streamed, log_returns(prices))
+
+
+def run_tests():
+    unittest.main(argv=[''], verbosity=2, exit=False)
+
+
+if __name__ == "__main__":
+    run_tests()
+
+    # QUICK CHECKS (not a substitute for unit tests)
+    prices = np.array([100.0, 110.0, 121.0])
+    prices_nan = np.array([100.0, np.nan, 105.0])
+    prices_neg = np.array([100.0, -5.0, 105.0])
+
+    try:
+        r = log_returns(prices)
+        print("log_returns([100,110,121]) ->", r)
+
+        r_nan = log_returns(prices_nan)
+        print("log_returns([100,nan,105]) ->", r_nan)
+
+        r_neg = log_returns(prices_neg)
+        print("log_returns([100,nan,105]) ->", r_neg)
+    except ValueError as error:
+        print("log_returns([100,-5,105]) ->", repr(error))
\ No newline at end of file
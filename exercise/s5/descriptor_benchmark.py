@@ -0,0 +1,91 @@
+"""
+Micro-benchmark: cost of an attribute assignment / read with plain attributes, the descriptors of descriptor_exercise.py
+and the slot-based descriptors of fast_descriptors.py. Each timing is the best of `repeat` runs, single runs vary too
+much between executions to compare descriptors within a few tens of nanoseconds.
+
+The ticker assignment (validation cache) and set_many are faster with fast_descriptors.py. A single price assignment
+or read costs about the same with both descriptors: most of it is the Python call of __set__ / __get__.
+
+Run from the project root with : python -m exercise.s5.descriptor_benchmark
+"""
+import re
+import timeit
+
+import numpy as np
+
+from exercise.s5.descriptor_exercise import NonNegativeFloat
+from exercise.s5.fast_descriptors import FastFinancialAsset
+
+
+class PlainAsset:
+    __slots__ = ('ticker', 'price', 'prev_close')
+
+    def __init__(self, ticker, price, prev_close):
+        self.ticker = ticker
+        self.price = price
+        self.prev_close = prev_close
+
+
+class RegexUpperTicker:
+    """UpperTicker as specified in descriptor_exercise.py: upper-case and regex validation on every assignment."""
+    _re = re.compile(r"^[A-Z]{1,10}$")
+
+    def __set_name__(self, owner, name):
+        self.public_name = name
+        self.storage_name = "_" + name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return getattr(obj, self.storage_name)
+
+    def __set__(self, obj, value):
+        value = str(value).upper()
+        if not self._re.match(value):
+            raise ValueError("Ticker must be 1-10 uppercase letters")
+        setattr(obj, self.storage_name, value)
+
+
+class DescriptorAsset:
+    ticker = RegexUpperTicker()
+    price = NonNegativeFloat()
+    prev_close = NonNegativeFloat()
+
+    def __init__(self, ticker, price, prev_close):
+        self.ticker = ticker
+        self.price = price
+        self.prev_close = prev_close
+
+
+def best_time(statement: str, globals_: dict, number: int, repeat: int) -> float:
+    return min(timeit.repeat(statement, globals=globals_, number=number, repeat=repeat))
+
+
+def run_benchmark(number: int = 200_000, n_assets: int = 3_000, repeat: int = 7):
+    assets = {"plain attributes": PlainAsset("AAPL", 150., 148.),
+              "descriptor_exercise": DescriptorAsset("AAPL", 150., 148.),
+              "fast_descriptors": FastFinancialAsset("AAPL", 150., 148.)}
+    results = {}
+    for name, asset in assets.items():
+        results[(name, "set price")] = best_time("asset.price = 151.5", {'asset': asset}, number, repeat)
+        results[(name, "get price")] = best_time("asset.price", {'asset': asset}, number, repeat)
+        results[(name, "set ticker")] = best_time("asset.ticker = 'aapl'", {'asset': asset}, number, repeat)
+
+    universe = [FastFinancialAsset("AAPL", 1., 1.) for _ in range(n_assets)]
+    prices = np.random.default_rng(0).uniform(10., 500., n_assets)
+    n_ticks = max(number // n_assets, 1)
+    results[("fast_descriptors", "set price, loop")] = best_time(
+        "for asset, price in zip(universe, prices): asset.price = price",
+        {'universe': universe, 'prices': prices.tolist()}, n_ticks, repeat) / n_assets * number / n_ticks
+    results[("fast_descriptors", "set price, set_many")] = best_time(
+        "FastFinancialAsset.price.set_many(universe, prices)",
+        {'FastFinancialAsset': FastFinancialAsset, 'universe': universe, 'prices': prices},
+        n_ticks, repeat) / n_assets * number / n_ticks
+
+    for (name, operation), seconds in results.items():
+        print(f"{name:<22} {operation:<22} {seconds / number * 1e9:>8.1f} ns per assignment / read")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,196 @@
+"""
+Low-overhead versions of the NonNegativeFloat / UpperTicker descriptors of descriptor_exercise.py, for objects updated
+on every tick.
+
+- The values are stored in the instance __slots__ (no instance __dict__). The descriptor reads / writes the slot with
+  getattr / setattr and the storage name computed once in __set_name__: in CPython this is faster than calling the
+  slot member descriptor (slot.__get__ / slot.__set__), whose method-wrapper call costs more than the name lookup.
+- NonNegativeFloat only calls float() (in a try/except) for values which are not already a float. This saves little:
+  a single price assignment costs about the same as with descriptor_exercise.NonNegativeFloat, most of the time being
+  the Python call of __set__ itself. The measurable gains are on the ticker and on set_many.
+- UpperTicker keeps a cache of the tickers already validated (input -> interned upper-case ticker): the upper-casing
+  and the regex only run the first time a ticker is seen, assigning a known ticker is a dict lookup.
+- set_many(objs, values) validates a whole column of values at once (one NumPy check for the prices) before writing
+  them, e.g. the prices of the whole universe at each tick.
+
+The owner class must declare the storage slots ("_" + attribute name):
+
+    class FastFinancialAsset:
+        __slots__ = ('_ticker', '_price', '_prev_close')
+        ticker = InternedUpperTicker()
+        price = SlotNonNegativeFloat()
+        prev_close = SlotNonNegativeFloat()
+
+Benchmark against plain attributes: python -m exercise.s5.descriptor_benchmark
+"""
+import re
+import sys
+import unittest
+
+import numpy as np
+
+
+class SlotDescriptor:
+    """Base class: value stored in the slot "_" + name of the owner class."""
+    def __set_name__(self, owner, name):
+        self.public_name = name
+        self.storage_name = "_" + name
+        slot = owner.__dict__.get(self.storage_name)
+        if slot is None or not hasattr(slot, '__set__'):
+            raise TypeError(f"{owner.__name__} must declare {self.storage_name!r} in its __slots__")
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return getattr(obj, self.storage_name)
+
+    def __delete__(self, obj):
+        raise AttributeError(f"Cannot delete {self.public_name}")
+
+    def set_many(self, objs, values):
+        """Validate all the values first, then write them: no object is updated if one value is invalid."""
+        if len(objs) != len(values):
+            raise ValueError("objs and values must have the same length")
+        storage_name = self.storage_name
+        for obj, value in zip(objs, self._validate_many(values)):
+            setattr(obj, storage_name, value)
+
+    def _validate_many(self, values) -> list:
+        raise NotImplementedError
+
+
+class SlotNonNegativeFloat(SlotDescriptor):
+    def __set__(self, obj, value):
+        if type(value) is not float:
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                raise TypeError(f"{self.public_name} must be a number") from None
+        if value < 0.0:
+            raise ValueError(f"{self.public_name} must be ≥ 0")
+        setattr(obj, self.storage_name, value)
+
+    def _validate_many(self, values) -> list:
+        try:
+            array = np.asarray(values, dtype=float)
+        except (TypeError, ValueError):
+            raise TypeError(f"{self.public_name} must be a number") from None
+        if array.ndim != 1:
+            raise ValueError(f"{self.public_name} values must be a 1-D sequence")
+        if (array < 0.0).any():
+            raise ValueError(f"{self.public_name} must be ≥ 0")
+        return array.tolist()
+
+
+class InternedUpperTicker(SlotDescriptor):
+    TICKER_PATTERN = re.compile(r"^[A-Z]{1,10}$")
+    MAX_CACHE_SIZE = 100_000
+
+    # input value -> validated, interned ticker, shared by all the instances of the descriptor
+    _validated: dict = {}
+
+    def __set__(self, obj, value):
+        try:
+            ticker = self._validated[value]
+        except (KeyError, TypeError):
+            ticker = self._validate(value)
+        setattr(obj, self.storage_name, ticker)
+
+    def _validate_many(self, values) -> list:
+        validated = self._validated
+        tickers = []
+        for value in values:
+            try:
+                tickers.append(validated[value])
+            except (KeyError, TypeError):
+                tickers.append(self._validate(value))
+        return tickers
+
+    def _validate(self, value) -> str:
+        ticker = str(value).upper()
+        if not self.TICKER_PATTERN.match(ticker):
+            raise ValueError("Ticker must be 1-10 uppercase letters")
+        ticker = sys.intern(ticker)
+        if len(self._validated) >= self.MAX_CACHE_SIZE:
+            self._validated.clear()
+        try:
+            self._validated[value] = ticker
+        except TypeError:
+            pass  # unhashable input, validated but not cached
+        return ticker
+
+
+class FastFinancialAsset:
+    __slots__ = ('_ticker', '_price', '_prev_close')
+
+    ticker = InternedUpperTicker()
+    price = SlotNonNegativeFloat()
+    prev_close = SlotNonNegativeFloat()
+
+    def __init__(self, ticker: str, price: float, prev_close: float):
+        self.ticker = ticker
+        self.price = price
+        self.prev_close = prev_close
+
+    @property
+    def daily_return(self):
+        if self.prev_close == 0:
+            raise ZeroDivisionError("prev_close is zero")
+        return (self.price / self.prev_close) - 1
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(ticker={self.ticker!r}, price={self.price!r})"
+
+
+class TestFastDescriptors(unittest.TestCase):
+    def setUp(self):
+        self.asset = FastFinancialAsset("aapl", 150, 148.0)
+
+    def test_values_are_validated_and_stored_in_slots(self):
+        self.assertEqual(self.asset.ticker, "AAPL")
+        self.assertEqual(self.asset.price, 150.0)
+        self.assertIsInstance(self.asset.price, float)
+        self.assertAlmostEqual(self.asset.daily_return, 150 / 148 - 1)
+        self.assertFalse(hasattr(self.asset, '__dict__'))
+
+    def test_invalid_values_raise(self):
+        with self.assertRaises(ValueError):
+            self.asset.price = -1.
+        with self.assertRaises(TypeError):
+            self.asset.prev_close = "abc"
+        with self.assertRaises(ValueError):
+            self.asset.ticker = "msft!"
+        with self.assertRaises(AttributeError):
+            del self.asset.price
+        self.assertEqual((self.asset.ticker, self.asset.price), ("AAPL", 150.0))
+
+    def test_validated_tickers_are_cached_and_interned(self):
+        other = FastFinancialAsset("aapl", 1., 1.)
+        self.assertIs(other.ticker, self.asset.ticker)
+        self.assertIn("aapl", InternedUpperTicker._validated)
+        other.ticker = "aapl"
+        self.assertEqual(other.ticker, "AAPL")
+
+    def test_set_many_is_all_or_nothing(self):
+        assets = [FastFinancialAsset(ticker, 1., 1.) for ticker in ("AAPL", "MSFT", "GOOG")]
+        FastFinancialAsset.price.set_many(assets, np.array([10., 20., 30.]))
+        self.assertEqual([asset.price for asset in assets], [10., 20., 30.])
+
+        with self.assertRaises(ValueError):
+            FastFinancialAsset.price.set_many(assets, [1., -2., 3.])
+        with self.assertRaises(ValueError):
+            FastFinancialAsset.ticker.set_many(assets, ["ibm", "bad ticker", "ge"])
+        self.assertEqual([asset.price for asset in assets], [10., 20., 30.])
+        self.assertEqual([asset.ticker for asset in assets], ["AAPL", "MSFT", "GOOG"])
+
+    def test_owner_without_slot_is_rejected(self):
+        with self.assertRaises((TypeError, RuntimeError)):
+            type("NoSlots", (), {'price': SlotNonNegativeFloat()})
+
+
+def run_tests():
+    unittest.main(argv=[''], verbosity=2, exit=False)
+
+
+if __name__ == '__main__':
+    run_tests()
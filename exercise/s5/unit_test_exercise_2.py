@@ -14,7 +14,6 @@ TestLogReturn
 import unittest
 
 import numpy as np
-from appscript.defaultterminology import elements
 
 
 def log_returns(prices:[]):
@@ -46,4 +45,4 @@ if __name__ == "__main__":
         r_neg = log_returns(prices_neg)
         print("log_returns([100,nan,105]) ->", r_neg)
     except NotImplementedError:
-        print("Implement log_returns first.")
\ No newline at end of file
+        print("Implement log_returns first.")
@@ -0,0 +1,342 @@
+"""
+Corrected version of Step 2 and Step 3 of the TP (src/finance_ml/linear_models.py and tests/test_linear_models.py).
+
+Instead of the explicit Normal Equation inverse θ = (XᵀX)⁻¹ Xᵀy, the normal equations (XᵀX) θ = Xᵀy are solved with a
+Cholesky factorization, which is faster and more stable than np.linalg.inv. Collinear features (singular XᵀX) fall
+back to a least-squares solve, which gives the same minimum-norm solution as np.linalg.pinv.
+
+Performance notes:
+    - y can be a 2-D array (one column per dependent series): XᵀX is factorized once and the factorization is reused
+      for every column, e.g. 3,000 stock returns regressed on the same factors.
+    - The intercept is handled by centering the moments (XᵀX - n·x̄x̄ᵀ) instead of stacking a column of ones to X.
+      To avoid the cancellation of this difference when the features have a large mean (e.g. prices around 1e6), the
+      moments are accumulated on X - x0 and y - y0, x0 and y0 being the means of the first chunk. fit reads X by
+      blocks of DEFAULT_CHUNK_SIZE rows unless chunk_size is given: only a chunk-sized temporary is created, X itself
+      is never copied.
+    - The fit only needs the moments n, Σx, Σy, XᵀX and Xᵀy. partial_fit accumulates them chunk by chunk, so fit can
+      consume a generator of chunks or a memory-mapped array (np.load(..., mmap_mode='r')) in constant memory.
+    - rolling_fit estimates the coefficients on every window of a series (e.g. 252-day rolling betas): the window
+      moments are updated by adding the new row and subtracting the dropped one (differences of cumulative sums)
+      and all the windows are solved in one batched call. A window containing a missing value (NaN) gets NaN
+      coefficients, for the affected target only when the gap is in y.
+"""
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve
+
+# XᵀX is treated as singular (collinear features) when its condition number exceeds 1 / RCOND
+RCOND = 1e-12
+# rows read at once by fit: bounds the shifted copy of the chunk (65,536 rows x 100 features = 52 MB)
+DEFAULT_CHUNK_SIZE = 65_536
+
+
+class LinearRegression:
+    def __init__(self, use_intercept=True):
+        self.use_intercept = use_intercept
+        self.coef_ = None
+        self.intercept_ = None
+        self._fitted = False
+        self._reset_moments()
+
+    def fit(self, X, y=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Fit the model on X and y (in-memory or memory-mapped arrays), read by blocks of chunk_size rows.
+        X can also be an iterable of (X_chunk, y_chunk) tuples, y being None in this case.
+        """
+        self._reset_moments()
+        if y is None:
+            chunks = X
+        else:
+            X = self._check_X(X)
+            y = np.asarray(y)
+            if y.shape[0] != X.shape[0]:
+                raise ValueError("X and y must have the same number of rows")
+            step = chunk_size or DEFAULT_CHUNK_SIZE
+            chunks = ((X[start:start + step], y[start:start + step]) for start in range(0, len(X), step))
+
+        for X_chunk, y_chunk in chunks:
+            self._accumulate(X_chunk, y_chunk)
+        self._solve()
+        return self
+
+    def partial_fit(self, X_chunk, y_chunk):
+        """Add a chunk of rows to the accumulated moments and update the coefficients."""
+        self._accumulate(X_chunk, y_chunk)
+        self._solve()
+        return self
+
+    def rolling_fit(self, X, y, window: int):
+        """
+        Fit the model on every window of `window` consecutive rows.
+
+        :param X: 2-D array (n_rows, n_features)
+        :param y: 1-D array (n_rows,) or 2-D array (n_rows, n_targets), e.g. the returns of the whole universe
+        :param window: number of rows in each window
+        :return: coefficients over time, shape (n_rows - window + 1, n_features[, n_targets]), row t being the fit on
+                 rows t to t + window - 1. The intercepts are stored in rolling_intercept_.
+        """
+        X = self._check_X(X)
+        y = np.asarray(y, dtype=float)
+        if y.shape[0] != X.shape[0]:
+            raise ValueError("X and y must have the same number of rows")
+        if not 0 < window <= len(X):
+            raise ValueError("window must be between 1 and the number of rows")
+        Y = y.reshape(len(y), -1)
+
+        # missing values (NaN) are handled per target: a window containing a NaN in X (every target) or in the target
+        # column of y gives NaN coefficients for this target only. The gaps are zeroed in the sums, on the complete
+        # windows the moments are then exactly those of the window.
+        valid_x = ~np.isnan(X).any(axis=1)
+        valid = valid_x[:, None] & ~np.isnan(Y)
+
+        # with an intercept the data can be shifted by the full-sample means, so that the added/subtracted moments
+        # stay small (less cancellation), the window centering removes the shift from the coefficients
+        if self.use_intercept:
+            shift_x = X[valid_x].mean(axis=0) if valid_x.any() else np.zeros(X.shape[1])
+            shift_y = np.where(valid, Y, 0.).sum(axis=0) / np.maximum(valid.sum(axis=0), 1)
+        else:
+            shift_x, shift_y = np.zeros(X.shape[1]), np.zeros(Y.shape[1])
+        Xs = np.where(valid_x[:, None], X - shift_x, 0.)
+        Ys = np.where(valid, Y - shift_y, 0.)
+
+        def window_sums(values):
+            total = np.cumsum(values, axis=0)
+            total[window:] = total[window:] - total[:-window]
+            return total[window - 1:]
+
+        complete = window_sums(valid.astype(float)) == window
+        complete_x = window_sums(valid_x.astype(float)) == window
+        sum_x, sum_y = window_sums(Xs), window_sums(Ys)
+        xtx = window_sums(Xs[:, :, None] * Xs[:, None, :])
+        xty = window_sums(Xs[:, :, None] * Ys[:, None, :])
+        if self.use_intercept:
+            xtx = xtx - sum_x[:, :, None] * sum_x[:, None, :] / window
+            xty = xty - sum_x[:, :, None] * sum_y[:, None, :] / window
+        xtx[~complete_x] = np.eye(X.shape[1])  # windows with a gap in X, their coefficients are set to NaN below
+
+        try:
+            coef = np.linalg.solve(xtx, xty)
+        except np.linalg.LinAlgError:
+            coef = np.linalg.pinv(xtx, rcond=RCOND, hermitian=True) @ xty
+
+        if self.use_intercept:
+            intercept = (sum_y / window + shift_y) - np.einsum('tp,tpk->tk', sum_x / window + shift_x, coef)
+        else:
+            intercept = np.zeros((len(coef), Y.shape[1]))
+        coef = np.where(complete[:, None, :], coef, np.nan)
+        intercept = np.where(complete, intercept, np.nan)
+
+        single_target = y.ndim == 1
+        self.rolling_coef_ = coef[:, :, 0] if single_target else coef
+        self.rolling_intercept_ = intercept[:, 0] if single_target else intercept
+        return self.rolling_coef_
+
+    def predict(self, X):
+        if not self._fitted:
+            raise RuntimeError("LinearRegression is not fitted yet, call fit first")
+        return self._check_X(X) @ self.coef_ + self.intercept_
+
+    def _reset_moments(self):
+        self._n = 0
+        self._sum_x = self._sum_y = self._xtx = self._xty = None
+        self._shift_x = self._shift_y = None
+        self._single_target = True
+
+    def _accumulate(self, X_chunk, y_chunk):
+        X_chunk = self._check_X(X_chunk)
+        y_chunk = np.asarray(y_chunk, dtype=float)
+        if y_chunk.shape[0] != X_chunk.shape[0]:
+            raise ValueError("X and y must have the same number of rows")
+        Y_chunk = y_chunk.reshape(len(y_chunk), -1)
+
+        if self._xtx is None:
+            self._single_target = y_chunk.ndim == 1
+            # moments of X - x0 and Y - y0 (x0, y0 = means of the first chunk), no shift without intercept
+            if self.use_intercept:
+                self._shift_x, self._shift_y = X_chunk.mean(axis=0), Y_chunk.mean(axis=0)
+            else:
+                self._shift_x, self._shift_y = np.zeros(X_chunk.shape[1]), np.zeros(Y_chunk.shape[1])
+            self._sum_x = np.zeros(X_chunk.shape[1])
+            self._sum_y = np.zeros(Y_chunk.shape[1])
+            self._xtx = np.zeros((X_chunk.shape[1], X_chunk.shape[1]))
+            self._xty = np.zeros((X_chunk.shape[1], Y_chunk.shape[1]))
+        elif X_chunk.shape[1] != len(self._sum_x) or Y_chunk.shape[1] != len(self._sum_y):
+            raise ValueError("Chunks must keep the same number of features and targets")
+
+        if self.use_intercept:
+            X_chunk, Y_chunk = X_chunk - self._shift_x, Y_chunk - self._shift_y
+        self._n += len(X_chunk)
+        self._sum_x += X_chunk.sum(axis=0)
+        self._sum_y += Y_chunk.sum(axis=0)
+        self._xtx += X_chunk.T @ X_chunk
+        self._xty += X_chunk.T @ Y_chunk
+
+    def _solve(self):
+        """Solve the normal equations from the accumulated moments (n, Σx, Σy, XᵀX, XᵀY) of the shifted data."""
+        n, xtx, xty = self._n, self._xtx, self._xty
+        if n == 0:
+            raise ValueError("Cannot fit a LinearRegression on 0 rows")
+        if self.use_intercept:
+            mean_x, mean_y = self._sum_x / n, self._sum_y / n
+            xtx = xtx - n * np.outer(mean_x, mean_x)
+            xty = xty - n * np.outer(mean_x, mean_y)
+
+        try:
+            factor = cho_factor(xtx)
+            pivots = np.abs(np.diag(factor[0]))
+            if pivots.min() ** 2 <= RCOND * pivots.max() ** 2:
+                raise np.linalg.LinAlgError("XᵀX is singular")
+            coef = cho_solve(factor, xty)
+        except np.linalg.LinAlgError:
+            coef = np.linalg.lstsq(xtx, xty, rcond=RCOND)[0]
+
+        if self.use_intercept:
+            intercept = (mean_y + self._shift_y) - (mean_x + self._shift_x) @ coef
+        else:
+            intercept = np.zeros(coef.shape[1])
+        self.coef_ = coef[:, 0] if self._single_target else coef
+        self.intercept_ = float(intercept[0]) if self._single_target else intercept
+        self._fitted = True
+
+    @staticmethod
+    def _check_X(X):
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X.reshape(-1, 1)
+        if X.ndim != 2:
+            raise ValueError("X must be a 2-D array")
+        return X
+
+
+class TestLinearRegression(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        self.X = rng.normal(size=(200, 3))
+        self.true_coef = np.array([1.5, -2.0, 0.5])
+        self.y = self.X @ self.true_coef + 3.0 + rng.normal(scale=0.01, size=200)
+
+    def test_fit_with_intercept(self):
+        model = LinearRegression().fit(self.X, self.y)
+        np.testing.assert_allclose(model.coef_, self.true_coef, atol=1e-2)
+        self.assertAlmostEqual(model.intercept_, 3.0, places=2)
+
+    def test_features_with_a_large_mean(self):
+        X = 1e6 + self.X
+        y = X @ self.true_coef + 3.0 + np.random.default_rng(0).normal(scale=0.01, size=200)
+        X_mean, y_mean = X.mean(axis=0), y.mean()
+        expected_coef = np.linalg.lstsq(X - X_mean, y - y_mean, rcond=None)[0]
+        expected_intercept = y_mean - X_mean @ expected_coef
+
+        for model in (LinearRegression().fit(X, y), LinearRegression().fit(X, y, chunk_size=32)):
+            np.testing.assert_allclose(model.coef_, expected_coef, rtol=1e-7)
+            self.assertAlmostEqual(model.intercept_, expected_intercept, delta=1e-3)
+
+    def test_fit_without_intercept_matches_lstsq(self):
+        model = LinearRegression(use_intercept=False).fit(self.X, self.y)
+        expected = np.linalg.lstsq(self.X, self.y, rcond=None)[0]
+        np.testing.assert_allclose(model.coef_, expected)
+        self.assertEqual(model.intercept_, 0.)
+
+    def test_many_targets_match_one_by_one_fits(self):
+        Y = np.column_stack([self.y, 2 * self.y, -self.y + 1])
+        model = LinearRegression().fit(self.X, Y)
+        self.assertEqual(model.coef_.shape, (3, 3))
+        for column in range(Y.shape[1]):
+            single = LinearRegression().fit(self.X, Y[:, column])
+            np.testing.assert_allclose(model.coef_[:, column], single.coef_)
+            self.assertAlmostEqual(model.intercept_[column], single.intercept_)
+        single_prediction = LinearRegression().fit(self.X, self.y).predict(self.X)
+        self.assertEqual(single_prediction.shape, (200,))
+        np.testing.assert_allclose(model.predict(self.X)[:, 0], single_prediction)
+
+    def test_collinear_features_fall_back_to_least_squares(self):
+        X = np.column_stack([self.X[:, 0], 2 * self.X[:, 0]])
+        model = LinearRegression().fit(X, self.y)
+        expected = np.linalg.pinv(X - X.mean(axis=0)) @ (self.y - self.y.mean())
+        np.testing.assert_allclose(model.coef_, expected, atol=1e-8)
+
+    def test_partial_fit_and_chunked_fit_match_full_fit(self):
+        full = LinearRegression().fit(self.X, self.y)
+
+        incremental = LinearRegression()
+        for start in range(0, 200, 30):
+            incremental.partial_fit(self.X[start:start + 30], self.y[start:start + 30])
+        chunked = LinearRegression().fit(self.X, self.y, chunk_size=50)
+        from_generator = LinearRegression().fit((self.X[start:start + 64], self.y[start:start + 64])
+                                                for start in range(0, 200, 64))
+
+        for model in (incremental, chunked, from_generator):
+            np.testing.assert_allclose(model.coef_, full.coef_)
+            self.assertAlmostEqual(model.intercept_, full.intercept_)
+
+    def test_fit_on_memory_mapped_array(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "X.npy")
+            np.save(path, self.X)
+            X_mmap = np.load(path, mmap_mode='r')
+            model = LinearRegression().fit(X_mmap, self.y, chunk_size=64)
+            del X_mmap
+        np.testing.assert_allclose(model.coef_, LinearRegression().fit(self.X, self.y).coef_)
+
+    def test_fit_does_not_copy_X(self):
+        X = np.random.default_rng(0).normal(loc=100., size=(300_000, 10))
+        y = X @ np.arange(10.) + 1.
+        tracemalloc.start()
+        try:
+            model = LinearRegression().fit(X, y)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, X.nbytes / 2)  # X is 24 MB, a chunk of 65,536 rows is 5 MB
+        np.testing.assert_allclose(model.coef_, np.arange(10.), atol=1e-8)
+
+    def test_rolling_fit_matches_fit_on_each_window(self):
+        Y = np.column_stack([self.y, self.X[:, 0] * np.linspace(0, 1, 200)])
+        window = 50
+        for use_intercept in (True, False):
+            model = LinearRegression(use_intercept=use_intercept)
+            coefs = model.rolling_fit(self.X, Y, window)
+            self.assertEqual(coefs.shape, (151, 3, 2))
+            for t in (0, 75, 150):
+                expected = LinearRegression(use_intercept=use_intercept).fit(self.X[t:t + window], Y[t:t + window])
+                np.testing.assert_allclose(coefs[t], expected.coef_, atol=1e-10)
+                np.testing.assert_allclose(model.rolling_intercept_[t], expected.intercept_, atol=1e-10)
+
+        single = LinearRegression().rolling_fit(self.X, self.y, window)
+        self.assertEqual(single.shape, (151, 3))
+
+    def test_rolling_fit_with_missing_values(self):
+        Y = np.column_stack([self.y, 2 * self.y])
+        Y[0, 1] = np.nan  # only the first window of target 1 contains the gap
+        X = self.X.copy()
+        X[100, 2] = np.nan  # windows 51 to 100 contain the gap, for every target
+        window = 50
+        model = LinearRegression()
+        coefs = model.rolling_fit(X, Y, window)
+
+        self.assertTrue(np.isnan(coefs[0, :, 1]).all())
+        self.assertFalse(np.isnan(coefs[0, :, 0]).any())
+        self.assertTrue(np.isnan(coefs[51:101]).all())
+        self.assertTrue(np.isnan(model.rolling_intercept_[51:101]).all())
+        complete = np.r_[1:51, 101:151]
+        self.assertFalse(np.isnan(coefs[complete]).any())
+        for t in (1, 120, 150):
+            expected = LinearRegression().fit(X[t:t + window], Y[t:t + window])
+            np.testing.assert_allclose(coefs[t], expected.coef_, atol=1e-10)
+            np.testing.assert_allclose(model.rolling_intercept_[t], expected.intercept_, atol=1e-10)
+
+    def test_predict_before_fit_raises(self):
+        with self.assertRaises(RuntimeError):
+            LinearRegression().predict(self.X)
+
+
+def run_tests():
+    unittest.main(argv=[''], verbosity=2, exit=False)
+
+
+if __name__ == '__main__':
+    run_tests()
@@ -50,6 +50,12 @@ Implement a LinearRegression class with the following methods:
         alternatively you can use the we can use the Moore–Penrose pseudoinverse matrix to handle collinear feature 
         with np.linalg.pinv(X)
         
+        Going further: computing the inverse explicitly is slower and less stable than solving the system 
+        (XᵀX) θ = Xᵀy with a factorization (Cholesky with scipy.linalg.cho_factor / cho_solve, or np.linalg.lstsq).
+        The factorization can be reused for a 2-D y (many dependent series against the same X), and the intercept 
+        can be obtained by centering X and y instead of copying X to add a column of ones.
+        See corrected_version/linear_models_corrected.py
+        
     predict(self, X): Make predictions using the trained model.
 
 Your implementation should handle cases with and without an intercept term and use numpy for efficient calculations.
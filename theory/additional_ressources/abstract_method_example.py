@@ -1,14 +1,22 @@
 import json
+import tempfile
+import unittest
 from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass, field
 from typing import List, Any
 
-import pandas as pd
 import datetime
 import requests
 import os
 from bs4 import BeautifulSoup
 
+from theory.additional_ressources.class_registry import ClassRegistry
+from theory.additional_ressources.html_extractor import (BeautifulSoupExtractor, ExtractedTag, HtmlExtractor,
+                                                         TagScanExtractor)
+from theory.additional_ressources.http_page_cache import HttpPageCache
+from theory.additional_ressources.record_sink import SCRAPPED_COLUMNS, CsvRecordSink
+from theory.additional_ressources.stand_in_server import StandInBoursoramaHandler, StandInServerTestCase
+
 @dataclass(init=True)
 class Product:
     input_param: dict = field(default_factory=dict[str, Any])
@@ -56,16 +64,28 @@ class ScrapperAbstract(metaclass=ABCMeta):
 
 class Scrapper(ScrapperAbstract):
 
-    def __init__(self, product: Product, headers_settings: dict):
+    def __init__(self, product: Product, headers_settings: dict, session: requests.Session = None,
+                 timeout: float = None, cache: HttpPageCache = None, extractor: HtmlExtractor = None):
         self._product_to_scrap = product
         self._headers = headers_settings
-        self._web_data = BeautifulSoup()
+        self._session = session
+        self._timeout = timeout
+        self._cache = cache
+        self._extractor = extractor if extractor is not None else BeautifulSoupExtractor()
+        self._html = None
+        self._parsed_web_data = None
         self._html_tag = list()
         self.__post_init__()
 
     def __post_init__(self):
         self._html_tag = self._get_html_tag()
-        self._web_data = self._get_web_data()
+
+    @property
+    def _web_data(self) -> BeautifulSoup:
+        """The page is only fetched and parsed the first time the data is read."""
+        if self._parsed_web_data is None:
+            self._parsed_web_data = self._get_web_data()
+        return self._parsed_web_data
 
     def _get_html_tag(self) -> List[List[str]]:
         """
@@ -79,8 +99,31 @@ class Scrapper(ScrapperAbstract):
 
         :return: beautiful object to read html content
         """
-        response = requests.get(url=self._product_to_scrap.url, headers=self._headers)
-        return BeautifulSoup(response.text, 'html.parser')
+        return BeautifulSoup(self._get_html(), 'html.parser')
+
+    def _get_html(self) -> str:
+        """
+
+        :return: html content of the product page, fetched once
+        """
+        if self._html is None:
+            http = self._session if self._session is not None else requests
+            if self._cache is not None:
+                self._html = self._cache.get(self._product_to_scrap.url, http, headers=self._headers,
+                                             timeout=self._timeout)
+            else:
+                response = http.get(url=self._product_to_scrap.url, headers=self._headers, timeout=self._timeout)
+                response.raise_for_status()
+                self._html = response.text
+        return self._html
+
+    def _find_tags(self, targets: dict[str, tuple[str, str]]) -> dict[str, ExtractedTag]:
+        """
+
+        :param targets: key -> (tag type, css class) of the tags to read
+        :return: key -> first matching tag, through the configured extractor
+        """
+        return self._extractor.extract(self._get_html(), targets)
 
     def get_data(self) -> dict[str, str]:
         """
@@ -90,6 +133,10 @@ class Scrapper(ScrapperAbstract):
         pass
 
 
+scrapper_registry = ClassRegistry("data source")
+
+
+@scrapper_registry.register("FT")
 class FTScrapper(Scrapper):
     def _get_html_tag(self) -> dict:
         return {'timestamp_tag_type': 'div',
@@ -101,14 +148,15 @@ class FTScrapper(Scrapper):
     def get_data(self) -> dict[str, Any]:
         tags = self._get_html_tag()
         timestamp_layout = "Data delayed at least 15 minutes, as of "
+        found = self._find_tags({"timestamp": (tags.get("timestamp_tag_type"), tags.get("timestamp_tag_name")),
+                                 "close": (tags.get("close_tag_type"), tags.get("close_tag_name"))})
         return_data = {'Product Code': self._product_to_scrap.product_code}
-        return_data.update({"Timestamp": self._web_data.find(tags.get("timestamp_tag_type"),
-                                                            {'class': tags.get("timestamp_tag_name")}).text.strip(timestamp_layout)})
-        return_data.update({"Close": self._web_data.find(tags.get("close_tag_type"),
-                                                        {'class': tags.get("close_tag_name")}).text})
+        return_data.update({"Timestamp": found["timestamp"].text.strip(timestamp_layout)})
+        return_data.update({"Close": found["close"].text})
         return return_data
 
 
+@scrapper_registry.register("Boursorama")
 class BoursoramaScrapper(Scrapper):
     def _get_html_tag(self) -> dict:
         return {'data_table_tag_type_general_info': 'div',
@@ -118,8 +166,9 @@ class BoursoramaScrapper(Scrapper):
 
     def get_data(self) -> dict[str, Any]:
         tags = self._get_html_tag()
-        data_table_general_info = self._web_data.find(tags.get('data_table_tag_type_general_info'),
-                                                        {'class': tags.get('data_table_tag_name_general_info')})
+        data_table_general_info = self._find_tags(
+            {"general_info": (tags.get('data_table_tag_type_general_info'),
+                              tags.get('data_table_tag_name_general_info'))})["general_info"]
 
         general_info_dict = json.loads(data_table_general_info.attrs.get(tags.get("attrs_general_info_dict")))
 
@@ -135,13 +184,68 @@ class BoursoramaScrapper(Scrapper):
 
 @dataclass(init=False)
 class ScrapperLauncher(object):
-    def __new__(cls, product_to_scrap: Product, headers_settings: dict) -> Scrapper:
-        if product_to_scrap.source == "Boursorama":
-            return BoursoramaScrapper(product_to_scrap, headers_settings)
-        elif product_to_scrap.source == "FT":
-            return FTScrapper(product_to_scrap, headers_settings)
-        else:
-            raise NotImplemented
+    def __new__(cls, product_to_scrap: Product, headers_settings: dict, **scrapper_settings) -> Scrapper:
+        return scrapper_registry.create(product_to_scrap.source, product_to_scrap, headers_settings,
+                                        **scrapper_settings)
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+class _FixtureScrapperMixin:
+    """Scrapper reading a saved page instead of the network, used by the tests and the extraction benchmark."""
+    fixture_file: str = None
+
+    def _get_html(self) -> str:
+        with open(os.path.join(FIXTURES_DIR, self.fixture_file), encoding='utf-8') as file:
+            return file.read()
+
+
+class TestScrappers(unittest.TestCase):
+    def _scrap(self, scrapper_cls, fixture_file, source, extractor):
+        fixture_scrapper = type('Fixture' + scrapper_cls.__name__, (_FixtureScrapperMixin, scrapper_cls),
+                                {'fixture_file': fixture_file})
+        product = Product.from_dict({'ProductCode': "BTCS", 'Product Type': "Fund", 'Data Source': source})
+        return fixture_scrapper(product, {}, extractor=extractor).get_data()
+
+    def test_extractors_return_the_same_data(self):
+        for scrapper_cls, fixture_file, source in ((BoursoramaScrapper, 'boursorama_page.html', 'Boursorama'),
+                                                   (FTScrapper, 'ft_page.html', 'FT')):
+            expected = self._scrap(scrapper_cls, fixture_file, source, BeautifulSoupExtractor())
+            self.assertEqual(self._scrap(scrapper_cls, fixture_file, source, TagScanExtractor()), expected)
+        self.assertEqual(expected['Close'], '108,947.53')
+
+    def test_launcher_dispatches_on_the_data_source(self):
+        product = Product.from_dict({'ProductCode': "BTCS", 'Product Type': "Fund", 'Data Source': "FT"})
+        self.assertIsInstance(ScrapperLauncher(product, {}), FTScrapper)
+        product.source = "Bloomberg"
+        with self.assertRaises(ValueError):
+            ScrapperLauncher(product, {})
+
+
+class TestScrapperWithStandInServer(StandInServerTestCase):
+    def _product(self, code: str) -> Product:
+        product = Product.from_dict({'ProductCode': code, 'Product Type': "Fund", 'Data Source': "Boursorama"})
+        product.url = self.base_url + code
+        return product
+
+    def test_scrapper_fetches_lazily(self):
+        scrapper = ScrapperLauncher(self._product("BTCS"), {"User-Agent": "Mozilla/5.0"})
+        self.assertEqual(StandInBoursoramaHandler.requests_received, [])
+        self.assertEqual(scrapper.get_data()['Close'], 100.5)
+        self.assertEqual(len(StandInBoursoramaHandler.requests_received), 1)
+
+    def test_scrapper_reads_through_the_cache(self):
+        headers = {"User-Agent": "Mozilla/5.0"}
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = HttpPageCache(cache_dir, ttl=3600)
+            self.assertEqual(ScrapperLauncher(self._product("BTCS"), headers, cache=cache).get_data()['Close'], 100.5)
+            self.assertEqual(ScrapperLauncher(self._product("BTCS"), headers, cache=cache).get_data()['Close'], 100.5)
+            self.assertEqual(StandInBoursoramaHandler.requests_received, [("BTCS", None)])
+
+    def test_http_errors_are_raised(self):
+        with self.assertRaises(requests.HTTPError):
+            ScrapperLauncher(self._product("MISSING"), {"User-Agent": "Mozilla/5.0"}).get_data()
 
 
 if __name__ == "__main__":
@@ -154,11 +258,15 @@ if __name__ == "__main__":
                     {'ProductCode': "BRR CME", 'Product Type': "Index", 'Data Source': "FT"}
                     ]
 
-    df_data = pd.DataFrame(
-        data=[ScrapperLauncher(product_to_scrap=Product().from_dict(product_param=product_param),
-                               headers_settings=headers_for_scrapping).get_data() for product_param in
-              product_list]
-    )
+    export_to_excel = True
+    today = datetime.datetime.today().strftime('%m_%d_%Y')
+
+    # every record is written to the CSV file as soon as it is scrapped, a failure keeps the products already read
+    with CsvRecordSink(path + '_Extract_data_scrapped' + today + '.csv', columns=SCRAPPED_COLUMNS,
+                       batch_size=1) as sink:
+        for product_param in product_list:
+            sink.write(ScrapperLauncher(product_to_scrap=Product().from_dict(product_param=product_param),
+                                        headers_settings=headers_for_scrapping).get_data())
 
-    df_data.to_excel(path + '_Extract_data_scrapped' + datetime.datetime.today().strftime('%m_%d_%Y') + '.xlsx',
-                     sheet_name='Export_' + datetime.datetime.today().strftime('%m_%d_%Y'), index=False)
\ No newline at end of file
+        if export_to_excel:
+            sink.to_excel(path + '_Extract_data_scrapped' + today + '.xlsx', sheet_name='Export_' + today)
@@ -0,0 +1,143 @@
+"""
+Concurrent scrapping of many products with the scrappers of abstract_method_example.py, the results being streamed to
+a RecordSink (record_sink.py).
+
+Run from the project root with : python -m theory.additional_ressources.batch_scrapper
+"""
+import datetime
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from theory.additional_ressources.abstract_method_example import Product, ScrapperLauncher
+from theory.additional_ressources.html_extractor import HtmlExtractor, TagScanExtractor
+from theory.additional_ressources.http_page_cache import HttpPageCache
+from theory.additional_ressources.record_sink import SCRAPPED_COLUMNS, CsvRecordSink
+from theory.additional_ressources.stand_in_server import StandInServerTestCase
+
+
+class BatchScrapper:
+    """
+    Scrap many products concurrently with a thread pool.
+    One keep-alive requests.Session is shared by all the requests sent to the same host, with at most
+    max_connections_per_host requests in flight per host, and every request has a timeout.
+    A product that cannot be scrapped is returned as {'Product Code': ..., 'Error': ...} instead of stopping the batch.
+    """
+    def __init__(self, headers_settings: dict, max_workers: int = 8, max_connections_per_host: int = 4,
+                 timeout: float = 10., cache: HttpPageCache = None, extractor: HtmlExtractor = None):
+        self._headers = headers_settings
+        self._cache = cache
+        self._extractor = extractor
+        self._max_workers = max_workers
+        self._max_connections_per_host = max_connections_per_host
+        self._timeout = timeout
+        self._sessions: dict[str, requests.Session] = {}
+        self._host_limits: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def scrap(self, products: List[Product]) -> List[dict[str, Any]]:
+        """Scrap the products, the results being returned in the order of the input list."""
+        return list(self.iter_scrap(products))
+
+    def iter_scrap(self, products: List[Product]):
+        """Yield the results in the order of the input list as soon as they are available, e.g. to a RecordSink."""
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            yield from executor.map(self._scrap_one, products)
+
+    def close(self):
+        for session in self._sessions.values():
+            session.close()
+        self._sessions.clear()
+
+    def _scrap_one(self, product: Product) -> dict[str, Any]:
+        session, host_limit = self._get_host_resources(urlsplit(product.url).netloc)
+        try:
+            with host_limit:
+                return ScrapperLauncher(product_to_scrap=product, headers_settings=self._headers, session=session,
+                                        timeout=self._timeout, cache=self._cache,
+                                        extractor=self._extractor).get_data()
+        except Exception as error:
+            return {'Product Code': product.product_code, 'Error': repr(error)}
+
+    def _get_host_resources(self, host: str):
+        with self._lock:
+            if host not in self._sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._max_connections_per_host)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+                self._host_limits[host] = threading.BoundedSemaphore(self._max_connections_per_host)
+            return self._sessions[host], self._host_limits[host]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class TestBatchScrapper(StandInServerTestCase):
+    def _product(self, code: str) -> Product:
+        product = Product.from_dict({'ProductCode': code, 'Product Type': "Fund", 'Data Source': "Boursorama"})
+        product.url = self.base_url + code
+        return product
+
+    def test_batch_scrap_returns_results_in_order(self):
+        codes = [f"P{i}" for i in range(20)]
+        with BatchScrapper({"User-Agent": "Mozilla/5.0"}, max_workers=8, max_connections_per_host=2) as scrapper:
+            results = scrapper.scrap([self._product(code) for code in codes])
+
+        self.assertEqual([result['Product Code'] for result in results], codes)
+        self.assertTrue(all(result['Close'] == 100.5 for result in results))
+
+    def test_failed_product_does_not_stop_the_batch(self):
+        with BatchScrapper({"User-Agent": "Mozilla/5.0"}) as scrapper:
+            results = scrapper.scrap([self._product("MISSING"), self._product("BTCS")])
+
+        self.assertIn('HTTPError', results[0]['Error'])
+        self.assertEqual(results[1]['Close'], 100.5)
+
+    def test_batch_scrap_streams_to_a_sink(self):
+        codes = [f"P{i}" for i in range(7)] + ["MISSING"]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "scrapped.csv")
+            with BatchScrapper({"User-Agent": "Mozilla/5.0"}) as scrapper, \
+                    CsvRecordSink(path, columns=SCRAPPED_COLUMNS, batch_size=3) as sink:
+                self.assertEqual(sink.write_many(scrapper.iter_scrap([self._product(code) for code in codes])), 8)
+            df_data = CsvRecordSink(path).read()
+
+        self.assertEqual(df_data['Product Code'].tolist(), codes)
+        self.assertEqual(df_data['Close'].iloc[0], 100.5)
+        self.assertTrue(df_data['Error'].iloc[:7].isna().all())
+        self.assertIn('404', df_data['Error'].iloc[7])
+
+
+if __name__ == "__main__":
+    path = os.getcwd()
+    headers_for_scrapping = {"User-Agent": "Mozilla/5.0"}
+
+    product_list = [
+                    {'ProductCode': "BTCS", 'Product Type': "Fund", 'Data Source': "Boursorama"},
+                    {'ProductCode': "BTCT", 'Product Type': "Fund", 'Data Source': "Boursorama"},
+                    {'ProductCode': "BRR CME", 'Product Type': "Index", 'Data Source': "FT"}
+                    ]
+
+    export_to_excel = True
+    today = datetime.datetime.today().strftime('%m_%d_%Y')
+
+    page_cache = HttpPageCache(os.path.join(path, '.scrapper_cache'), ttl=15 * 60)
+    with BatchScrapper(headers_settings=headers_for_scrapping, cache=page_cache,
+                       extractor=TagScanExtractor()) as batch_scrapper, \
+            CsvRecordSink(path + '_Extract_data_scrapped' + today + '.csv', columns=SCRAPPED_COLUMNS) as sink:
+        sink.write_many(batch_scrapper.iter_scrap([Product().from_dict(product_param=product_param)
+                                                   for product_param in product_list]))
+
+        if export_to_excel:
+            sink.to_excel(path + '_Extract_data_scrapped' + today + '.xlsx', sheet_name='Export_' + today)
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+Class registry used by the factories (FinancialInstrumentFactory in theory/s5.py, ScrapperLauncher in
+abstract_method_example.py).
+
+Instead of an if/elif chain comparing strings on every creation, each concrete class registers itself under one or
+more keys with a decorator and the factory does a dict lookup:
+
+    instrument_registry = ClassRegistry("financial instrument")
+
+    @instrument_registry.register("stock")
+    class Stock:
+        ...
+
+    instrument_registry.create("Stock", ticker="AAPL", price=150)
+
+Keys are case-insensitive. The spelling received by get() is remembered, so the normalisation (str.lower) only happens
+the first time a spelling is seen, then it is a plain dict hit.
+"""
+import unittest
+from typing import Any, Callable, Dict, Iterable, List
+
+
+class ClassRegistry:
+    def __init__(self, kind: str, normalize: Callable[[str], str] = str.lower):
+        """
+        :param kind: what the registered classes are, used in the error messages
+        :param normalize: function applied to the keys (case-insensitive lookup by default)
+        """
+        self.kind = kind
+        self._normalize = normalize
+        self._classes: Dict[str, type] = {}
+        self._aliases: Dict[str, type] = {}
+
+    def register(self, *keys: str):
+        """Class decorator registering the class under keys (its name if no key is given)."""
+        def decorator(cls):
+            for key in keys or (cls.__name__,):
+                normalized = self._normalize(key)
+                if normalized in self._classes and self._classes[normalized] is not cls:
+                    raise ValueError(f"{self.kind} {key!r} is already registered to {self._classes[normalized]}")
+                self._classes[normalized] = cls
+            self._aliases.clear()
+            return cls
+        return decorator
+
+    def get(self, key: str) -> type:
+        try:
+            return self._aliases[key]
+        except KeyError:
+            pass
+        try:
+            cls = self._classes[self._normalize(key)]
+        except (KeyError, AttributeError, TypeError):
+            raise ValueError(f"Invalid {self.kind} type: {key!r}") from None
+        self._aliases[key] = cls
+        return cls
+
+    def create(self, key: str, *args, **kwargs):
+        return self.get(key)(*args, **kwargs)
+
+    def create_many(self, specs: Iterable[Dict[str, Any]], type_key: str = 'type') -> List[Any]:
+        """
+        Create one object per spec, spec[type_key] giving the registered type and the other items the constructor
+        keyword arguments. The specs are grouped by type so that the class is resolved once per type, and a class
+        defining a create_batch(list_of_kwargs) classmethod builds its whole group in one call.
+        The objects are returned in the order of the specs.
+        """
+        groups: Dict[str, List] = {}
+        n_specs = 0
+        for index, spec in enumerate(specs):
+            kwargs = dict(spec)
+            groups.setdefault(kwargs.pop(type_key), []).append((index, kwargs))
+            n_specs += 1
+
+        created = [None] * n_specs
+        for key, group in groups.items():
+            cls = self.get(key)
+            indices = [index for index, _ in group]
+            create_batch = getattr(cls, 'create_batch', None)
+            if create_batch is not None:
+                objects = create_batch([kwargs for _, kwargs in group])
+            else:
+                objects = [cls(**kwargs) for _, kwargs in group]
+            for index, obj in zip(indices, objects):
+                created[index] = obj
+        return created
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self.get(key)
+        except ValueError:
+            return False
+        return True
+
+    def __repr__(self):
+        return f"ClassRegistry({self.kind!r}, keys={sorted(self._classes)})"
+
+
+class TestClassRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = ClassRegistry("financial instrument")
+
+        @self.registry.register("stock", "equity")
+        class Stock:
+            def __init__(self, ticker, price):
+                self.ticker = ticker
+                self.price = price
+
+        @self.registry.register("bond")
+        class Bond:
+            batches = []
+
+            def __init__(self, issuer, face_value):
+                self.issuer = issuer
+                self.face_value = face_value
+
+            @classmethod
+            def create_batch(cls, list_of_kwargs):
+                cls.batches.append(len(list_of_kwargs))
+                return [cls(**kwargs) for kwargs in list_of_kwargs]
+
+        self.Stock, self.Bond = Stock, Bond
+
+    def test_lookup_is_case_insensitive(self):
+        self.assertIs(self.registry.get("Stock"), self.Stock)
+        self.assertIs(self.registry.get("EQUITY"), self.Stock)
+        self.assertEqual(self.registry.create("BOND", issuer="US Government", face_value=1000).face_value, 1000)
+        self.assertIn("bond", self.registry)
+
+    def test_unknown_type_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            self.registry.create("option", strike=100)
+        with self.assertRaises(ValueError):
+            self.registry.get(None)
+
+    def test_key_cannot_be_registered_twice(self):
+        with self.assertRaises(ValueError):
+            self.registry.register("Stock")(type("OtherStock", (), {}))
+
+    def test_create_many_groups_by_type_and_keeps_order(self):
+        specs = [{'type': "stock", 'ticker': "AAPL", 'price': 150},
+                 {'type': "bond", 'issuer': "US Government", 'face_value': 1000},
+                 {'type': "Stock", 'ticker': "MSFT", 'price': 400},
+                 {'type': "bond", 'issuer': "France", 'face_value': 100}]
+        created = self.registry.create_many(specs)
+
+        self.assertEqual([type(obj) for obj in created], [self.Stock, self.Bond, self.Stock, self.Bond])
+        self.assertEqual([created[0].ticker, created[2].ticker], ["AAPL", "MSFT"])
+        self.assertEqual(self.Bond.batches, [2])
+        self.assertEqual(specs[0]['type'], "stock")  # the specs are not modified
+
+
+def run_tests():
+    unittest.main(argv=[''], verbosity=2, exit=False)
+
+
+if __name__ == '__main__':
+    run_tests()
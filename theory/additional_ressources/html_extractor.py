@@ -0,0 +1,116 @@
+"""
+HTML extraction layer of the scrappers of abstract_method_example.py: an HtmlExtractor finds the first tag matching
+each target in a page. TagScanExtractor streams the page and stops as soon as every target has been read, instead of
+building the whole BeautifulSoup tree.
+"""
+import unittest
+from abc import ABCMeta, abstractmethod
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Any
+
+from bs4 import BeautifulSoup
+
+
+@dataclass
+class ExtractedTag:
+    text: str
+    attrs: dict[str, Any]
+
+
+class HtmlExtractor(metaclass=ABCMeta):
+    """
+    Extraction layer of the scrappers: find the first tag matching each target in a page.
+    targets maps a key to a (tag type, css class) tuple, the result maps each key to an ExtractedTag (None if absent).
+    """
+    @abstractmethod
+    def extract(self, html: str, targets: dict[str, tuple[str, str]]) -> dict[str, ExtractedTag]:
+        raise NotImplemented
+
+
+class BeautifulSoupExtractor(HtmlExtractor):
+    """Build the full BeautifulSoup tree. parser can be a faster backend such as 'lxml' when it is installed."""
+    def __init__(self, parser: str = 'html.parser'):
+        self.parser = parser
+
+    def extract(self, html: str, targets: dict[str, tuple[str, str]]) -> dict[str, ExtractedTag]:
+        soup = BeautifulSoup(html, self.parser)
+        found = {key: soup.find(tag_type, {'class': class_name}) for key, (tag_type, class_name) in targets.items()}
+        return {key: ExtractedTag(tag.text, dict(tag.attrs)) if tag is not None else None
+                for key, tag in found.items()}
+
+
+class _ScanComplete(Exception):
+    pass
+
+
+class _TargetedTagParser(HTMLParser):
+    """Streaming parser collecting the text and attributes of the target tags, without building any tree."""
+    def __init__(self, targets: dict[str, tuple[str, str]]):
+        super().__init__(convert_charrefs=True)
+        self._pending = dict(targets)
+        self._open = []  # [key, tag type, nesting depth, text parts, attrs] of the target tags being read
+        self.found = {}
+
+    def handle_starttag(self, tag, attrs):
+        for open_tag in self._open:
+            if open_tag[1] == tag:
+                open_tag[2] += 1
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        for key, (tag_type, class_name) in list(self._pending.items()):
+            if tag == tag_type and class_name in classes:
+                del self._pending[key]
+                self._open.append([key, tag, 1, [], attrs])
+
+    def handle_data(self, data):
+        for open_tag in self._open:
+            open_tag[3].append(data)
+
+    def handle_endtag(self, tag):
+        for open_tag in list(self._open):
+            if open_tag[1] == tag:
+                open_tag[2] -= 1
+                if open_tag[2] == 0:
+                    self._open.remove(open_tag)
+                    self.found[open_tag[0]] = ExtractedTag(''.join(open_tag[3]), open_tag[4])
+        if not self._pending and not self._open:
+            raise _ScanComplete
+
+
+class TagScanExtractor(HtmlExtractor):
+    """Scan the page with the standard library HTMLParser and stop as soon as every target tag has been read."""
+    def extract(self, html: str, targets: dict[str, tuple[str, str]]) -> dict[str, ExtractedTag]:
+        parser = _TargetedTagParser(targets)
+        try:
+            parser.feed(html)
+            parser.close()
+        except _ScanComplete:
+            pass
+        return {key: parser.found.get(key) for key in targets}
+
+
+class TestHtmlExtractors(unittest.TestCase):
+    def test_extractors_return_the_same_tags(self):
+        html = ("<html><body><div class='header'>menu</div><span class='price up'>1<b>0</b>2</span>"
+                "<div class='data' data-ist-init='{\"last\": 102}'></div></body></html>")
+        targets = {'price': ('span', 'price'), 'data': ('div', 'data')}
+        for extractor in (BeautifulSoupExtractor(), TagScanExtractor()):
+            found = extractor.extract(html, targets)
+            self.assertEqual(found['price'].text, '102')
+            self.assertEqual(found['data'].attrs['data-ist-init'], '{"last": 102}')
+
+    def test_tag_scan_handles_nested_tags_and_missing_targets(self):
+        html = "<div class='a b'>x<div>y</div>z</div><span class='c'>1</span><p>never reached"
+        found = TagScanExtractor().extract(html, {'a': ('div', 'b'), 'c': ('span', 'c'), 'none': ('p', 'd')})
+        self.assertEqual(found['a'].text, 'xyz')
+        self.assertEqual(found['c'].text, '1')
+        self.assertIsNone(found['none'])
+
+
+def run_tests():
+    unittest.main(argv=[''], verbosity=2, exit=False)
+
+
+if __name__ == '__main__':
+    run_tests()
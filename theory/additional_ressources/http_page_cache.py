@@ -0,0 +1,110 @@
+"""
+On-disk HTTP page cache used by the scrappers of abstract_method_example.py (Scrapper(..., cache=HttpPageCache(...))).
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import requests
+
+from theory.additional_ressources.stand_in_server import StandInBoursoramaHandler, StandInServerTestCase
+
+
+class HttpPageCache:
+    """
+    On-disk HTTP cache keyed by URL: <sha256(url)>.html holds the page and <sha256(url)>.json its metadata
+    (ETag, Last-Modified, fetch time).
+    A page fetched less than ttl seconds ago is served from disk without any request. An older page is revalidated
+    with a conditional request (If-None-Match / If-Modified-Since): a 304 answer reuses the page on disk, so only
+    changed pages are downloaded again.
+    """
+    def __init__(self, cache_dir: str, ttl: float = 3600.):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, url: str, http=requests, headers: dict = None, timeout: float = None) -> str:
+        body_path, meta_path = self._paths(url)
+        meta = self._read_meta(meta_path)
+        if meta is not None and time.time() - meta['fetched_at'] < self.ttl:
+            with open(body_path, encoding='utf-8') as file:
+                return file.read()
+
+        request_headers = dict(headers or {})
+        if meta is not None:
+            if meta.get('etag'):
+                request_headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request_headers['If-Modified-Since'] = meta['last_modified']
+        response = http.get(url=url, headers=request_headers, timeout=timeout)
+
+        if response.status_code == 304 and meta is not None:
+            meta['fetched_at'] = time.time()
+            self._write(meta_path, json.dumps(meta))
+            with open(body_path, encoding='utf-8') as file:
+                return file.read()
+
+        response.raise_for_status()
+        self._write(body_path, response.text)
+        self._write(meta_path, json.dumps({'url': url, 'etag': response.headers.get('ETag'),
+                                           'last_modified': response.headers.get('Last-Modified'),
+                                           'fetched_at': time.time()}))
+        return response.text
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key + '.html'), os.path.join(self.cache_dir, key + '.json')
+
+    @staticmethod
+    def _read_meta(meta_path: str):
+        try:
+            with open(meta_path, encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write(self, path: str, content: str):
+        # write then rename so that a concurrent reader never sees a partial file
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8') as file:
+            file.write(content)
+        os.replace(tmp_path, path)
+
+
+class TestHttpPageCache(StandInServerTestCase):
+    def test_fresh_pages_are_served_from_disk(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = HttpPageCache(cache_dir, ttl=3600)
+            first = cache.get(self.base_url + "BTCS")
+            self.assertEqual(cache.get(self.base_url + "BTCS"), first)
+            self.assertEqual(StandInBoursoramaHandler.requests_received, [("BTCS", None)])
+
+    def test_stale_pages_are_revalidated(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = HttpPageCache(cache_dir, ttl=0)
+            first = cache.get(self.base_url + "BTCS")
+            self.assertEqual(cache.get(self.base_url + "BTCS"), first)
+            self.assertEqual(StandInBoursoramaHandler.requests_received[-1], ("BTCS", '"v1"'))
+
+            StandInBoursoramaHandler.version = "v2"
+            cache.get(self.base_url + "BTCS")
+            with open(cache._paths(self.base_url + "BTCS")[1]) as file:
+                self.assertEqual(json.load(file)['etag'], '"v2"')
+
+    def test_http_errors_are_raised_and_not_cached(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = HttpPageCache(cache_dir)
+            with self.assertRaises(requests.HTTPError):
+                cache.get(self.base_url + "MISSING")
+            self.assertEqual(os.listdir(cache_dir), [])
+
+
+def run_tests():
+    unittest.main(argv=[''], verbosity=2, exit=False)
+
+
+if __name__ == '__main__':
+    run_tests()
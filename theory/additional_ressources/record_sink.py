@@ -0,0 +1,184 @@
+"""
+Destinations of the scrapped records (BatchScrapper.iter_scrap in batch_scrapper.py): the records are appended to a
+CSV file or to Parquet part files by batches instead of being kept in memory for a single Excel export at the end.
+"""
+import csv
+import glob
+import importlib.util
+import os
+import tempfile
+import unittest
+from abc import ABCMeta, abstractmethod
+from typing import Any, List
+
+import pandas as pd
+
+
+SCRAPPED_COLUMNS = ['Product Code', 'Timestamp', 'Close', 'Previous Close', '1D Return', 'Error']
+
+
+class RecordSink(metaclass=ABCMeta):
+    """
+    Destination of the scrapped records. Records are buffered and written by batches of batch_size, so the results
+    already flushed are kept on disk if the run stops, and the whole batch is never held in memory.
+    """
+    def __init__(self, batch_size: int = 100):
+        if batch_size <= 0:
+            raise ValueError("batch_size must be > 0")
+        self.batch_size = batch_size
+        self._buffer: List[dict[str, Any]] = []
+
+    def write(self, record: dict[str, Any]):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, records) -> int:
+        """Write an iterable of records (e.g. BatchScrapper.iter_scrap), return the number of records written."""
+        count = 0
+        for record in records:
+            self.write(record)
+            count += 1
+        return count
+
+    def flush(self):
+        if self._buffer:
+            self._write_batch(self._buffer)
+            self._buffer = []
+
+    def close(self):
+        self.flush()
+
+    def to_excel(self, path: str, sheet_name: str = 'Export'):
+        """Optional final export of everything written to the sink (needs openpyxl)."""
+        self.flush()
+        self.read().to_excel(path, sheet_name=sheet_name, index=False)
+
+    @abstractmethod
+    def read(self) -> pd.DataFrame:
+        raise NotImplemented
+
+    @abstractmethod
+    def _write_batch(self, records: List[dict[str, Any]]):
+        raise NotImplemented
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CsvRecordSink(RecordSink):
+    """
+    Append the records to a CSV file. Reopening an existing file appends to it with its header columns.
+    If columns is not provided, they are taken from the first batch; a record with an unknown column is rejected.
+    """
+    def __init__(self, path: str, columns: List[str] = None, batch_size: int = 100, fsync: bool = False):
+        super().__init__(batch_size)
+        self.path = path
+        self.columns = list(columns) if columns is not None else self._read_header()
+        self.fsync = fsync
+        self._file = None
+        self._writer = None
+
+    def write(self, record: dict[str, Any]):
+        if self.columns is not None:
+            unknown = set(record) - set(self.columns)
+            if unknown:
+                raise ValueError(f"Columns {sorted(unknown)} are not in the sink columns {self.columns}")
+        super().write(record)
+
+    def read(self) -> pd.DataFrame:
+        self.flush()
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return pd.DataFrame(columns=self.columns)
+        return pd.read_csv(self.path)
+
+    def close(self):
+        super().close()
+        if self._file is not None:
+            self._file.close()
+            self._file = self._writer = None
+
+    def _write_batch(self, records: List[dict[str, Any]]):
+        if self.columns is None:
+            self.columns = list(dict.fromkeys(key for record in records for key in record))
+        if self._writer is None:
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            self._file = open(self.path, 'a', newline='', encoding='utf-8')
+            self._writer = csv.DictWriter(self._file, fieldnames=self.columns)
+            if new_file:
+                self._writer.writeheader()
+        self._writer.writerows(records)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _read_header(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return None
+        with open(self.path, newline='', encoding='utf-8') as file:
+            return next(csv.reader(file))
+
+
+class ParquetRecordSink(RecordSink):
+    """
+    Columnar sink: every batch is written as a new part file (part-00000.parquet, ...) in directory, so appending
+    never rewrites the previous parts. Needs a parquet engine (pyarrow or fastparquet).
+    """
+    def __init__(self, directory: str, batch_size: int = 1000):
+        super().__init__(batch_size)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._n_parts = len(self._part_files())
+
+    def read(self) -> pd.DataFrame:
+        self.flush()
+        parts = [pd.read_parquet(path) for path in self._part_files()]
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+    def _write_batch(self, records: List[dict[str, Any]]):
+        path = os.path.join(self.directory, f"part-{self._n_parts:05d}.parquet")
+        pd.DataFrame(records).to_parquet(path, index=False)
+        self._n_parts += 1
+
+    def _part_files(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.directory, "part-*.parquet")))
+
+
+class TestRecordSinks(unittest.TestCase):
+    def test_csv_sink_flushes_by_batch_and_appends(self):
+        records = [{'Product Code': f"P{i}", 'Close': float(i)} for i in range(5)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "scrapped.csv")
+            sink = CsvRecordSink(path, batch_size=2)
+            sink.write_many(records[:3])
+            self.assertEqual(len(pd.read_csv(path)), 2)  # the full batch is on disk, the last record is buffered
+            sink.close()
+
+            with CsvRecordSink(path, batch_size=2) as sink:
+                self.assertEqual(sink.columns, ['Product Code', 'Close'])
+                sink.write_many(records[3:])
+                with self.assertRaises(ValueError):
+                    sink.write({'Product Code': "P5", 'Volume': 1})
+            self.assertEqual(CsvRecordSink(path).read()['Close'].tolist(), [0., 1., 2., 3., 4.])
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow') or importlib.util.find_spec('fastparquet'),
+                         "no parquet engine installed")
+    def test_parquet_sink_writes_one_part_per_batch(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with ParquetRecordSink(directory, batch_size=2) as sink:
+                sink.write_many({'Product Code': f"P{i}", 'Close': float(i)} for i in range(5))
+            self.assertEqual(len(glob.glob(os.path.join(directory, "part-*.parquet"))), 3)
+            with ParquetRecordSink(directory) as sink:
+                sink.write({'Product Code': "P5", 'Close': 5.})
+            self.assertEqual(ParquetRecordSink(directory).read()['Close'].tolist(), [0., 1., 2., 3., 4., 5.])
+
+
+def run_tests():
+    unittest.main(argv=[''], verbosity=2, exit=False)
+
+
+if __name__ == '__main__':
+    run_tests()
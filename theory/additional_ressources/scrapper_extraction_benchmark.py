@@ -0,0 +1,43 @@
+"""
+Extraction benchmark: time to read the scrapped values from the saved fixture pages with each HtmlExtractor.
+
+The fixture pages in fixtures/ are stand-ins with the same structure as the Boursorama and FT pages (target tags near
+the top of a large document), no network access is needed.
+
+Run from the project root with : python -m theory.additional_ressources.scrapper_extraction_benchmark
+"""
+import timeit
+
+from theory.additional_ressources.abstract_method_example import (BoursoramaScrapper, FTScrapper, Product,
+                                                                  _FixtureScrapperMixin)
+from theory.additional_ressources.html_extractor import BeautifulSoupExtractor, TagScanExtractor
+
+
+def build_extractors() -> dict:
+    extractors = {"BeautifulSoup (html.parser)": BeautifulSoupExtractor(),
+                  "TagScan (streaming, early stop)": TagScanExtractor()}
+    try:
+        import lxml  # noqa: F401
+        extractors["BeautifulSoup (lxml)"] = BeautifulSoupExtractor('lxml')
+    except ImportError:
+        pass
+    return extractors
+
+
+def run_benchmark(number: int = 20):
+    pages = {"Boursorama": (BoursoramaScrapper, 'boursorama_page.html'), "FT": (FTScrapper, 'ft_page.html')}
+    results = {}
+    for source, (scrapper_cls, fixture_file) in pages.items():
+        fixture_scrapper = type('Fixture' + scrapper_cls.__name__, (_FixtureScrapperMixin, scrapper_cls),
+                                {'fixture_file': fixture_file})
+        product = Product.from_dict({'ProductCode': "BTCS", 'Product Type': "Fund", 'Data Source': source})
+        for name, extractor in build_extractors().items():
+            scrapper = fixture_scrapper(product, {}, extractor=extractor)
+            seconds = timeit.timeit(scrapper.get_data, number=number) / number
+            results[(source, name)] = seconds
+            print(f"{source:<12} {name:<35} {seconds * 1000:>8.2f} ms per page")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,55 @@
+"""
+Local HTTP server standing in for the Boursorama pages, used by the tests of the scrapper modules
+(abstract_method_example.py, http_page_cache.py, batch_scrapper.py) so that they never reach the real website.
+"""
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StandInBoursoramaHandler(BaseHTTPRequestHandler):
+    """
+    /cours/<code> returns a c-faceplate div with its JSON data, /cours/MISSING returns a 404.
+    Pages carry an ETag (the current version) and conditional requests on an unchanged page get a 304.
+    """
+    version = "v1"
+    requests_received: list = []
+
+    def do_GET(self):
+        code = self.path.rsplit('/', 1)[-1]
+        type(self).requests_received.append((code, self.headers.get('If-None-Match')))
+        if code == "MISSING":
+            self.send_error(404)
+            return
+        etag = f'"{self.version}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        data = json.dumps({'tradeDate': '2025-08-29', 'last': 100.5, 'previousClose': 100., 'variation': 0.5,
+                           'symbol': code})
+        body = f"<html><body><div class='c-faceplate' data-ist-init='{data}'></div></body></html>".encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServerTestCase(unittest.TestCase):
+    """Start a fresh stand-in server for every test, the page of a product code being at self.base_url + code."""
+    def setUp(self):
+        StandInBoursoramaHandler.version = "v1"
+        StandInBoursoramaHandler.requests_received = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInBoursoramaHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/cours/"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -9,6 +9,7 @@ from datetime import datetime
 
 from scipy.stats import norm
 import math
+import numpy as np
 
 """
 ## 1.10 - Polymorphism
@@ -272,6 +273,8 @@ class FinancialAssetUtil:
         - If a list of prices is provided:
           - Calculates returns between consecutive prices.
           - Use method='simple' or method='log' to specify the return type.
+        - If a NumPy array of prices is provided (1-D, or 2-D with one column per asset):
+          - Calculates the returns between consecutive rows in one vectorized operation, returns an array.
         """
         if len(args) == 2 and all(isinstance(arg, (int, float)) for arg in args):
             initial_value, final_value = args
@@ -299,6 +302,16 @@ class FinancialAssetUtil:
                     raise ValueError("Invalid method. Use 'simple' or 'log'.")
                 returns.append(ret)
             return returns
+        elif len(args) == 1 and isinstance(args[0], np.ndarray):
+            prices = args[0].astype(float, copy=False)
+            if prices.shape[0] < 2:
+                raise ValueError("Price array must contain at least two prices.")
+            if method == 'simple':
+                return prices[1:] / prices[:-1] - 1
+            elif method == 'log':
+                return np.log(prices[1:] / prices[:-1])
+            else:
+                raise ValueError("Invalid method. Use 'simple' or 'log'.")
         else:
             raise ValueError("Invalid arguments provided.")
 
@@ -325,6 +338,10 @@ returns_log = FinancialAssetUtil.calculate_return(price_series, method='log')
 print(f"Logarithmic Returns: {[f'{r:.4f}' for r in returns_log]}")
 # Output: Logarithmic Returns: ['0.0488', '-0.0191', '0.0474']
 
+# 5. Returns from a NumPy array of prices, one column per asset (no conversion to list)
+price_matrix = np.array([[100, 50], [105, 51], [103, 49]])
+print(f"Simple Returns matrix: {FinancialAssetUtil.calculate_return(price_matrix)}")
+
 
 """
 ## Abstraction in Python
@@ -14,6 +14,7 @@ from datetime import datetime
 
 from exercise.s3.corrected_version.cutom_error_corrected import NegativePriceException
 from theory.s3 import FinancialAsset
+from theory.s3 import FinancialAssetUtil as S3FinancialAssetUtil
 
 """
 ## Utility classes
@@ -83,56 +84,138 @@ class FinancialAssetUtil:
     def __calculate_log_return(initial_value, final_value):
         return math.log(final_value / initial_value)
 
+    @staticmethod
+    def calculate_returns(prices: np.ndarray, method="simple") -> np.ndarray:
+        """
+        Calculates the returns between consecutive prices with array operations.
+
+        Parameters:
+        - prices: NumPy array of prices, 1-D or 2-D (one row per date, one column per asset).
+        - method: 'simple' (default) or 'log'.
+
+        Returns:
+        - Array of returns with one row less than prices.
+        """
+        # same computation as the NumPy array path of calculate_return in theory/s3.py
+        return S3FinancialAssetUtil.calculate_return(np.asarray(prices, dtype=float), method=method)
+
     @staticmethod
     def calculate_volatility(returns):
         """
         Calculates the volatility (standard deviation) of a series of returns.
 
         Parameters:
-        - returns: List or array of returns.
+        - returns: List, tuple or NumPy array of returns. A 2-D array holds one asset per column.
 
         Returns:
-        - Volatility (standard deviation) of the returns.
+        - Volatility (standard deviation) of the returns, one value per column for a 2-D array.
         """
+        if isinstance(returns, np.ndarray):
+            if returns.shape[0] < 2:
+                raise ValueError("Returns array must contain at least two returns.")
+            return np.std(returns, axis=0, ddof=1)
         if not isinstance(returns, (list, tuple)):
-            raise ValueError("Returns must be a list or tuple.")
+            raise ValueError("Returns must be a list, tuple or NumPy array.")
         if len(returns) < 2:
             raise ValueError("Returns list must contain at least two returns.")
         return statistics.stdev(returns)
 
+    @staticmethod
+    def calculate_annualized_volatility(returns, periods_per_year: int = 252):
+        """
+        Calculates the annualized volatility of a series of returns.
+
+        Parameters:
+        - returns: List, tuple or NumPy array of returns (2-D: one asset per column).
+        - periods_per_year: number of return periods in a year (252 for daily returns).
+
+        Returns:
+        - Annualized volatility, one value per column for a 2-D array.
+        """
+        return FinancialAssetUtil.calculate_volatility(returns) * math.sqrt(periods_per_year)
+
     @staticmethod
     def calculate_drawdown(prices):
         """
-        Calculates the drawdowns for a series of prices.
+        Calculates the drawdowns for a series of prices, the running peak being computed with np.maximum.accumulate.
 
         Parameters:
-        - prices: List of prices.
+        - prices: List of prices, or NumPy array (2-D: one row per date, one series per column).
 
         Returns:
-        - List of drawdown values.
-        """
-        if not isinstance(prices, list):
-            raise ValueError("Prices must be a list.")
-        peak = prices[0]
-        drawdowns = []
-        for price in prices:
-            if price > peak:
-                peak = price
-            drawdown = (peak - price) / peak
-            drawdowns.append(drawdown)
-        return drawdowns
+        - List of drawdown values for a list, array of drawdowns (same shape as prices) for an array.
+        """
+        if not isinstance(prices, (list, np.ndarray)):
+            raise ValueError("Prices must be a list or a NumPy array.")
+        values = np.asarray(prices, dtype=float)
+        peak = np.maximum.accumulate(values, axis=0)
+        drawdowns = (peak - values) / peak
+        return drawdowns.tolist() if isinstance(prices, list) else drawdowns
 
     def calculate_max_drawdown(self, prices):
         """
         Calculates the max drawdowns for a series of prices.
 
         Parameters:
-        - prices: List of prices.
+        - prices: List of prices, or NumPy array (2-D: one series per column).
 
         Returns:
-        - max drawdown value.
+        - max drawdown value, one value per column for a 2-D array.
         """
-        return np.max(self.calculate_drawdown(prices))
+        return np.max(self.calculate_drawdown(np.asarray(prices, dtype=float)), axis=0)
+
+    @staticmethod
+    def calculate_drawdown_statistics(prices, dates=None) -> dict:
+        """
+        Calculates the drawdown statistics of one or many price / NAV series with array operations only.
+
+        Parameters:
+        - prices: List or NumPy array of prices (2-D: one row per date, one series per column).
+        - dates: optional sequence of dates aligned with the rows, used to report dates instead of row indexes.
+
+        Returns:
+        - dict with, for each series:
+            max_drawdown: largest drawdown,
+            peak / trough: date (or index) of the peak before the max drawdown and of its lowest point,
+            recovery: first date the peak price is reached again after the trough (None if not recovered),
+            max_duration: longest number of periods spent below a previous peak.
+        """
+        values = np.asarray(prices, dtype=float)
+        one_series = values.ndim == 1
+        values = values.reshape(len(values), -1)
+        if len(values) == 0:
+            raise ValueError("Prices must contain at least one price.")
+        n_dates, n_series = values.shape
+        rows = np.arange(n_dates)[:, None]
+
+        peak = np.maximum.accumulate(values, axis=0)
+        drawdowns = (peak - values) / peak
+        last_peak_row = np.maximum.accumulate(np.where(values >= peak, rows, 0), axis=0)
+
+        columns = np.arange(n_series)
+        trough_row = np.argmax(drawdowns, axis=0)
+        peak_row = last_peak_row[trough_row, columns]
+        recovered = (rows > trough_row) & (values >= peak[trough_row, columns])
+        max_drawdown = drawdowns[trough_row, columns]
+        # a series which never fell below its peak has no drawdown to recover from
+        recovery_row = np.where(recovered.any(axis=0) & (max_drawdown > 0), np.argmax(recovered, axis=0), -1)
+
+        def _label(row):
+            if row < 0:
+                return None
+            return dates[row] if dates is not None else int(row)
+
+        statistics_by_series = {
+            "max_drawdown": max_drawdown,
+            "peak": [_label(row) for row in peak_row],
+            "trough": [_label(row) for row in trough_row],
+            "recovery": [_label(row) for row in recovery_row],
+            "max_duration": np.max(rows - last_peak_row, axis=0),
+        }
+        if one_series:
+            return {key: (value[0].item() if isinstance(value, np.ndarray) else value[0])
+                    for key, value in statistics_by_series.items()}
+        return statistics_by_series
 
     @staticmethod
     def calculate_cumulative_return(returns):
@@ -140,17 +223,234 @@ class FinancialAssetUtil:
         Calculates the cumulative return from a series of returns.
 
         Parameters:
-        - returns: List of returns.
+        - returns: List of returns, or NumPy array (2-D: one asset per column).
 
         Returns:
-        - Cumulative return value.
+        - Cumulative return value, one value per column for a 2-D array.
         """
+        if isinstance(returns, np.ndarray):
+            return np.prod(1 + returns, axis=0) - 1
         cumulative = 1.0
         for r in returns:
             cumulative *= (1 + r)
         return cumulative - 1
 
 
+    @staticmethod
+    def calculate_rolling_mean(returns, window: int = None):
+        """
+        Calculates the rolling (or expanding when window is None) mean of returns.
+
+        Parameters:
+        - returns: NumPy array of returns, 1-D or 2-D (one row per date, one asset per column).
+        - window: number of periods in the window, None for an expanding window.
+
+        Returns:
+        - Array with the same shape as returns, NaN until the window is full.
+        """
+        shift, sums, counts = FinancialAssetUtil.__window_sums(returns, window)
+        return shift + sums["x"] / counts
+
+    @staticmethod
+    def calculate_rolling_volatility(returns, window: int = None, ddof: int = 1):
+        """
+        Calculates the rolling (or expanding) standard deviation of returns.
+        Each step costs O(1): the window sums of the returns and squared returns are obtained from cumulative sums
+        (added row minus dropped row), after centering on the column mean to keep the computation numerically stable.
+
+        Parameters:
+        - returns: NumPy array of returns, 1-D or 2-D (one asset per column).
+        - window: number of periods in the window, None for an expanding window.
+        - ddof: delta degrees of freedom (1 for the sample standard deviation).
+
+        Returns:
+        - Array with the same shape as returns, NaN until the window holds more than ddof returns.
+        """
+        _, sums, counts = FinancialAssetUtil.__window_sums(returns, window)
+        return np.sqrt(FinancialAssetUtil.__window_covariance(sums, "x", "x", counts, ddof))
+
+    @staticmethod
+    def calculate_rolling_sharpe(returns, window: int = None, risk_free_rate: float = 0.,
+                                 periods_per_year: int = 252):
+        """
+        Calculates the rolling (or expanding) annualized Sharpe ratio.
+
+        Parameters:
+        - returns: NumPy array of periodic returns, 1-D or 2-D (one asset per column).
+        - window: number of periods in the window, None for an expanding window.
+        - risk_free_rate: annual risk-free rate.
+        - periods_per_year: number of return periods in a year (252 for daily returns).
+
+        Returns:
+        - Array with the same shape as returns.
+        """
+        excess_returns = np.asarray(returns, dtype=float) - risk_free_rate / periods_per_year
+        mean = FinancialAssetUtil.calculate_rolling_mean(excess_returns, window)
+        volatility = FinancialAssetUtil.calculate_rolling_volatility(excess_returns, window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return mean / volatility * math.sqrt(periods_per_year)
+
+    @staticmethod
+    def calculate_rolling_beta(returns, benchmark_returns, window: int = None):
+        """
+        Calculates the rolling (or expanding) beta of each asset against a benchmark: cov(asset, benchmark) / var(benchmark).
+
+        Parameters:
+        - returns: NumPy array of returns, 1-D or 2-D (one asset per column).
+        - benchmark_returns: 1-D NumPy array of benchmark returns aligned with the rows of returns.
+        - window: number of periods in the window, None for an expanding window.
+
+        Returns:
+        - Array with the same shape as returns.
+        """
+        _, sums, counts = FinancialAssetUtil.__window_sums(returns, window, benchmark_returns)
+        covariance = FinancialAssetUtil.__window_covariance(sums, "x", "y", counts, 1)
+        variance = FinancialAssetUtil.__window_covariance(sums, "y", "y", counts, 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return covariance / variance
+
+    @staticmethod
+    def calculate_rolling_correlation(returns, benchmark_returns, window: int = None):
+        """
+        Calculates the rolling (or expanding) correlation of each asset with a benchmark.
+
+        Parameters:
+        - returns: NumPy array of returns, 1-D or 2-D (one asset per column).
+        - benchmark_returns: 1-D NumPy array of benchmark returns aligned with the rows of returns.
+        - window: number of periods in the window, None for an expanding window.
+
+        Returns:
+        - Array with the same shape as returns.
+        """
+        _, sums, counts = FinancialAssetUtil.__window_sums(returns, window, benchmark_returns)
+        covariance = FinancialAssetUtil.__window_covariance(sums, "x", "y", counts, 1)
+        variance_x = FinancialAssetUtil.__window_covariance(sums, "x", "x", counts, 1)
+        variance_y = FinancialAssetUtil.__window_covariance(sums, "y", "y", counts, 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return covariance / np.sqrt(variance_x * variance_y)
+
+    @staticmethod
+    def __window_sums(returns, window, benchmark_returns=None):
+        """
+        Window sums of the centered returns (x), benchmark (y) and their products, from cumulative sums.
+        Missing returns (NaN, e.g. before the listing of an asset) are counted per column: a NaN is summed as 0 and the
+        counts hold the number of valid rows in each window. A rolling window containing a gap gets a NaN count (the
+        statistics are NaN for this window only, as with pandas rolling), an expanding window skips the gaps.
+        """
+        x = np.asarray(returns, dtype=float)
+        if window is not None and not 0 < window <= len(x):
+            raise ValueError("window must be between 1 and the number of returns.")
+        valid = ~np.isnan(x)
+        if benchmark_returns is not None:
+            y = np.asarray(benchmark_returns, dtype=float)
+            if y.shape[0] != x.shape[0]:
+                raise ValueError("returns and benchmark_returns must have the same number of rows.")
+            y = np.broadcast_to(y.reshape((-1,) + (1,) * (x.ndim - 1)), x.shape)
+            valid &= ~np.isnan(y)
+
+        n_valid = np.maximum(valid.sum(axis=0), 1)
+        shift = np.where(valid, x, 0.).sum(axis=0) / n_valid
+        centered = {"x": np.where(valid, x - shift, 0.)}
+        if benchmark_returns is not None:
+            centered["y"] = np.where(valid, y - np.where(valid, y, 0.).sum(axis=0) / n_valid, 0.)
+        products = {"xx": centered["x"] ** 2}
+        if "y" in centered:
+            products.update({"xy": centered["x"] * centered["y"], "yy": centered["y"] ** 2})
+
+        sums = {}
+        for key, values in {**centered, **products, "n": valid.astype(float)}.items():
+            total = np.cumsum(values, axis=0)
+            if window is not None:
+                total[window:] = total[window:] - total[:-window]
+            sums[key] = total
+        counts = sums.pop("n")
+        counts = np.where(counts >= (window or 1), counts, np.nan)
+        return shift, sums, counts
+
+    @staticmethod
+    def __window_covariance(sums, first, second, counts, ddof):
+        product_key = "".join(sorted(first + second))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = (sums[product_key] - sums[first] * sums[second] / counts) / (counts - ddof)
+        covariance = np.where(counts > ddof, covariance, np.nan)  # NaN counts (gaps) compare as False
+        return np.maximum(covariance, 0.) if first == second else covariance
+
+import unittest
+import unittest.mock
+
+
+class TestFinancialAssetUtil(unittest.TestCase):
+    def setUp(self):
+        self.prices = np.array([[100., 50.], [105., 51.], [103., 49.], [108., 52.]])
+
+    def test_array_returns_match_the_list_path(self):
+        for method in ('simple', 'log'):
+            for column in range(self.prices.shape[1]):
+                expected = S3FinancialAssetUtil.calculate_return(self.prices[:, column].tolist(), method=method)
+                np.testing.assert_allclose(S3FinancialAssetUtil.calculate_return(self.prices[:, column],
+                                                                                 method=method), expected)
+                np.testing.assert_allclose(FinancialAssetUtil.calculate_returns(self.prices, method)[:, column],
+                                           expected)
+        np.testing.assert_allclose(FinancialAssetUtil.calculate_returns([100, 105, 103]), [0.05, 103 / 105 - 1])
+        with self.assertRaises(ValueError):
+            FinancialAssetUtil.calculate_returns(self.prices[:1])
+        with self.assertRaises(ValueError):
+            FinancialAssetUtil.calculate_returns(self.prices, method='arithmetic')
+
+    def test_array_volatility_and_cumulative_return_match_the_list_path(self):
+        returns = FinancialAssetUtil.calculate_returns(self.prices)
+        for column in range(returns.shape[1]):
+            column_returns = returns[:, column].tolist()
+            self.assertAlmostEqual(FinancialAssetUtil.calculate_volatility(returns)[column],
+                                   FinancialAssetUtil.calculate_volatility(column_returns))
+            self.assertAlmostEqual(FinancialAssetUtil.calculate_volatility(returns[:, column]),
+                                   FinancialAssetUtil.calculate_volatility(column_returns))
+            self.assertAlmostEqual(FinancialAssetUtil.calculate_annualized_volatility(returns)[column],
+                                   FinancialAssetUtil.calculate_volatility(column_returns) * math.sqrt(252))
+            self.assertAlmostEqual(FinancialAssetUtil.calculate_cumulative_return(returns)[column],
+                                   FinancialAssetUtil.calculate_cumulative_return(column_returns))
+            self.assertAlmostEqual(FinancialAssetUtil.calculate_cumulative_return(returns[:, column]),
+                                   self.prices[-1, column] / self.prices[0, column] - 1)
+        self.assertAlmostEqual(FinancialAssetUtil.calculate_annualized_volatility([0.01, -0.01, 0.02], 12),
+                               statistics.stdev([0.01, -0.01, 0.02]) * math.sqrt(12))
+
+    def test_drawdown_statistics(self):
+        statistics = FinancialAssetUtil.calculate_drawdown_statistics([100., 120., 90., 110., 125., 100.])
+        self.assertAlmostEqual(statistics["max_drawdown"], 0.25)
+        self.assertEqual((statistics["peak"], statistics["trough"], statistics["recovery"]), (1, 2, 4))
+        self.assertEqual(statistics["max_duration"], 2)
+
+    def test_rolling_statistics_match_pandas_with_missing_returns(self):
+        import pandas as pd
+        rng = np.random.default_rng(0)
+        returns = rng.normal(0., 0.01, size=(300, 3))
+        returns[:10, 1] = np.nan  # asset listed after the start of the sample
+        returns[150, 2] = np.nan  # one missing quote
+        benchmark = rng.normal(0., 0.01, size=300)
+        frame, bench = pd.DataFrame(returns), pd.Series(benchmark)
+
+        for window, rolling in ((60, frame.rolling(60)), (None, frame.expanding())):
+            np.testing.assert_allclose(FinancialAssetUtil.calculate_rolling_mean(returns, window),
+                                       rolling.mean().to_numpy(), equal_nan=True)
+            np.testing.assert_allclose(FinancialAssetUtil.calculate_rolling_volatility(returns, window),
+                                       rolling.std().to_numpy(), equal_nan=True)
+        np.testing.assert_allclose(FinancialAssetUtil.calculate_rolling_correlation(returns, benchmark, 60),
+                                   frame.rolling(60).corr(bench).to_numpy(), equal_nan=True)
+        np.testing.assert_allclose(FinancialAssetUtil.calculate_rolling_beta(returns, benchmark, 60),
+                                   (frame.rolling(60).cov(bench).T / bench.rolling(60).var()).T.to_numpy(),
+                                   equal_nan=True)
+
+        volatility = FinancialAssetUtil.calculate_rolling_volatility(returns, 60)
+        self.assertFalse(np.isnan(volatility[-1]).any())
+        self.assertTrue(np.isnan(volatility[150:210, 2]).all())
+        self.assertFalse(np.isnan(volatility[210:, 2]).any())
+
+    def test_drawdown_statistics_without_drawdown(self):
+        statistics = FinancialAssetUtil.calculate_drawdown_statistics([1., 2., 3., 4.])
+        self.assertEqual(statistics["max_drawdown"], 0.)
+        self.assertIsNone(statistics["recovery"])
+
+
 """
 ## Static Methods : @staticmethod
     ** Definition/Concept** 
@@ -615,18 +915,507 @@ class TradeLogger:
         return wrapper
 
 
+"""
+The TradeLogger above opens the file, writes one line and closes it on every trade: the caller pays for the open/close
+system calls and the disk write before getting its trade back.
+BufferedTradeLogger keeps the trade logging off the execution path: the wrapper only appends (date, trade) to an
+in-memory buffer, a background thread formats the lines and writes them to a file kept open, every flush_interval
+seconds or as soon as max_buffer trades are waiting.
+fsync_policy sets when the data is forced to the disk: "never" (left to the OS), "flush" (after every write, safest,
+slowest) or "close" (once at shutdown). close() is registered with atexit so the buffered trades are written when the
+program ends, it can also be called explicitly.
+"""
+import atexit
+import os
+import tempfile
+import threading
+import time
+
+
+class BufferedTradeLogger(TradeLogger):
+    FSYNC_POLICIES = ("never", "flush", "close")
+
+    def __init__(self, log_file='trade_log.txt', flush_interval=1.0, max_buffer=1000, fsync_policy="never"):
+        super().__init__(log_file)
+        if fsync_policy not in self.FSYNC_POLICIES:
+            raise ValueError(f"fsync_policy must be one of {self.FSYNC_POLICIES}")
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.fsync_policy = fsync_policy
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake_up = threading.Event()
+        self._file = None
+        self._thread = None
+        self._closed = False
+
+    def __call__(self, execute_trade_func):
+        def wrapper(*args, **kwargs):
+            trade_result = execute_trade_func(*args, **kwargs)
+            if not self._buffer_trade(trade_result):
+                # the logger was closed while the trade was executed: write it directly, like TradeLogger
+                with self._write_lock, open(self.log_file, 'a') as file:
+                    file.writelines(self._format_lines([(datetime.now(), trade_result)]))
+            return trade_result
+
+        return wrapper
+
+    def log(self, trade_result):
+        if not self._buffer_trade(trade_result):
+            raise RuntimeError("BufferedTradeLogger is closed")
+
+    def flush(self):
+        """Write the buffered trades now (in the calling thread)."""
+        # the buffer is taken under _write_lock so that the batches are written in the order they were taken
+        with self._write_lock:
+            with self._buffer_lock:
+                pending, self._buffer = self._buffer, []
+            if not pending:
+                return
+            if self._file is None:
+                self._file = open(self.log_file, 'a')
+            self._file.writelines(self._format_lines(pending))
+            self._file.flush()
+            if self.fsync_policy == "flush":
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        """Stop the background thread, write the remaining trades and close the file."""
+        with self._buffer_lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._wake_up.set()
+            thread.join()
+            atexit.unregister(self.close)
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                if self.fsync_policy == "close":
+                    os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+
+    def _buffer_trade(self, trade_result) -> bool:
+        """Add the trade to the buffer, False if the logger is closed."""
+        # _closed is checked under the lock set by close(): a trade is either buffered before the final flush or refused
+        with self._buffer_lock:
+            if self._closed:
+                return False
+            if self._thread is None:
+                self._start()
+            self._buffer.append((datetime.now(), trade_result))
+            buffer_size = len(self._buffer)
+        if buffer_size >= self.max_buffer:
+            self._wake_up.set()
+        return True
+
+    @staticmethod
+    def _format_lines(pending):
+        return [f"{_date} - Trade Executed - Details: {trade_result}\n" for _date, trade_result in pending]
+
+    def _start(self):
+        # called by _buffer_trade() with _buffer_lock held
+        self._thread = threading.Thread(target=self._run, name="BufferedTradeLogger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while not self._closed:
+            self._wake_up.wait(self.flush_interval)
+            self._wake_up.clear()
+            self.flush()
+
+
+class TestBufferedTradeLogger(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.directory.name, "trades.txt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _logged_lines(self):
+        if not os.path.exists(self.log_file):
+            return []
+        with open(self.log_file) as file:
+            return file.readlines()
+
+    def _wait_for_lines(self, n_lines, timeout=5.):
+        deadline = time.monotonic() + timeout
+        while len(self._logged_lines()) < n_lines and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self._logged_lines()
+
+    def test_flush_when_max_buffer_is_reached(self):
+        logger = BufferedTradeLogger(self.log_file, flush_interval=60., max_buffer=3)
+        for i in range(3):
+            logger.log({'ticker': "AAPL", 'qty': i})
+        self.assertEqual(len(self._wait_for_lines(3)), 3)
+        logger.close()
+
+    def test_flush_every_flush_interval(self):
+        logger = BufferedTradeLogger(self.log_file, flush_interval=0.05, max_buffer=1000)
+        logger.log({'ticker': "AAPL", 'qty': 1})
+        lines = self._wait_for_lines(1)
+        self.assertEqual(len(lines), 1)
+        self.assertIn("Trade Executed - Details: {'ticker': 'AAPL', 'qty': 1}", lines[0])
+        logger.close()
+
+    def test_close_writes_the_buffered_trades(self):
+        logger = BufferedTradeLogger(self.log_file, flush_interval=60., max_buffer=1000)
+        logger.log({'ticker': "AAPL", 'qty': 1})
+        logger.log({'ticker': "MSFT", 'qty': 2})
+        self.assertEqual(self._logged_lines(), [])
+        logger.close()
+        self.assertEqual(len(self._logged_lines()), 2)
+
+    def test_log_after_close_raises(self):
+        logger = BufferedTradeLogger(self.log_file)
+        logger.log({'qty': 1})
+        logger.close()
+        with self.assertRaises(RuntimeError):
+            logger.log({'qty': 2})
+        self.assertEqual(len(self._logged_lines()), 1)
+
+    def test_trade_executed_after_close_is_returned_and_written(self):
+        logger = BufferedTradeLogger(self.log_file)
+        execute = logger(lambda qty: {'qty': qty})
+        self.assertEqual(execute(1), {'qty': 1})
+        logger.close()
+        self.assertEqual(execute(2), {'qty': 2})
+        lines = self._logged_lines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn("{'qty': 2}", lines[-1])
+
+    def test_explicit_flush_keeps_the_trades_in_order(self):
+        logger = BufferedTradeLogger(self.log_file, flush_interval=0.0001, max_buffer=5)
+        stop = threading.Event()
+
+        def flush_until_stopped():
+            while not stop.is_set():
+                logger.flush()
+
+        flusher = threading.Thread(target=flush_until_stopped)
+        flusher.start()
+        for i in range(2000):
+            logger.log(i)
+            if i % 10 == 0:
+                time.sleep(0.0001)  # let the background thread and the flusher take batches concurrently
+        stop.set()
+        flusher.join()
+        logger.close()
+        logged = [int(line.rsplit(": ", 1)[1]) for line in self._logged_lines()]
+        self.assertEqual(logged, list(range(2000)))
+
+    def test_no_trade_is_lost_when_closing_during_logging(self):
+        logger = BufferedTradeLogger(self.log_file, flush_interval=0.001, max_buffer=10)
+        accepted = [0] * 4
+
+        def log_until_closed(worker):
+            try:
+                while True:
+                    logger.log({'worker': worker})
+                    accepted[worker] += 1
+            except RuntimeError:
+                pass
+
+        workers = [threading.Thread(target=log_until_closed, args=(worker,)) for worker in range(4)]
+        for worker in workers:
+            worker.start()
+        time.sleep(0.05)
+        logger.close()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(len(self._logged_lines()), sum(accepted))
+
+
+"""
+The text log lines ("<date> - Trade Executed - Details: {...}") are easy to read but slow and ambiguous to parse back.
+TradeJournal is an append-only structured journal: one JSON object per line (the newline is the record delimiter, 
+json.dumps escapes the newlines inside the values), each record holding its timestamp and the trade details.
+An in-memory index keeps the byte offset of every record by timestamp and by ticker, so replay(ticker, start, end) 
+seeks directly to the matching records instead of reading and parsing the whole file. The index is rebuilt with one 
+scan when an existing journal is reopened (an incomplete last line left by a crash is truncated).
+The file is only opened (and the index built) when the journal is first used, and close() is registered with atexit.
+Like TradeLogger, a TradeJournal instance can decorate the trade execution function.
+"""
+import bisect
+import json
+
+
+class TradeJournal:
+    def __init__(self, path='trade_journal.jsonl'):
+        self.path = path
+        self._file = None
+        self._lock = threading.RLock()  # the write position and the index are updated together under this lock
+
+    def __call__(self, execute_trade_func):
+        def wrapper(*args, **kwargs):
+            trade_result = execute_trade_func(*args, **kwargs)
+            self.append(trade_result)
+            return trade_result
+
+        return wrapper
+
+    def __len__(self):
+        self._open()
+        return len(self._offsets)
+
+    def append(self, trade_result: dict, timestamp: datetime = None) -> int:
+        """Write one trade record, return its byte offset in the journal."""
+        timestamp = timestamp or datetime.now()
+        line = json.dumps({'timestamp': timestamp.isoformat(), **trade_result}, default=str).encode() + b"\n"
+        with self._lock:
+            self._open()
+            offset = self._end
+            self._file.write(line)
+            self._end += len(line)
+            self._index(timestamp, trade_result.get('ticker'), offset)
+        return offset
+
+    def append_many(self, trade_results: list, timestamp: datetime = None):
+        """Write several trade records (e.g. the trades of one batch) with a single write call."""
+        timestamp = timestamp or datetime.now()
+        lines = [json.dumps({'timestamp': timestamp.isoformat(), **trade_result}, default=str).encode() + b"\n"
+                 for trade_result in trade_results]
+        with self._lock:
+            self._open()
+            self._file.write(b"".join(lines))
+            for trade_result, line in zip(trade_results, lines):
+                self._index(timestamp, trade_result.get('ticker'), self._end)
+                self._end += len(line)
+
+    def replay(self, ticker=None, start: datetime = None, end: datetime = None):
+        """
+        Iterate over the records (dict with a datetime 'timestamp') in time order, optionally restricted to one ticker
+        and to start <= timestamp <= end.
+        """
+        # the records to read are taken under the lock, the records appended during the replay are not returned
+        with self._lock:
+            self._open()
+            self.flush()
+            if ticker is None and start is None and end is None and self._in_file_order:
+                offsets = None
+                journal_end = self._end
+            else:
+                timestamps, offsets = self._by_ticker.get(ticker, ([], [])) if ticker is not None \
+                    else (self._timestamps, self._offsets)
+                lo = bisect.bisect_left(timestamps, start) if start is not None else 0
+                hi = bisect.bisect_right(timestamps, end) if end is not None else len(timestamps)
+                offsets = offsets[lo:hi]
+
+        if offsets is None:
+            with open(self.path, 'rb') as file:
+                position = 0
+                for line in file:
+                    position += len(line)
+                    if position > journal_end:
+                        break
+                    yield self._decode(line)
+            return
+
+        with open(self.path, 'rb') as file:
+            for offset in offsets:
+                file.seek(offset)
+                yield self._decode(file.readline())
+
+    def tickers(self) -> list:
+        self._open()
+        return list(self._by_ticker)
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _open(self):
+        """Build the index of the existing records and open the journal for appending, on first use."""
+        if self._file is not None:
+            return
+        with self._lock:
+            if self._file is not None:
+                return
+            self._timestamps, self._offsets = [], []
+            self._by_ticker = {}
+            self._in_file_order = True  # False once a record is appended with an earlier timestamp than the last one
+            self._end = self._build_index()
+            self._file = open(self.path, 'ab')
+            atexit.register(self.close)
+
+    def _build_index(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        offset = 0
+        with open(self.path, 'rb+') as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    file.truncate(offset)
+                    break
+                record = json.loads(line)
+                self._index(datetime.fromisoformat(record['timestamp']), record.get('ticker'), offset)
+                offset += len(line)
+        return offset
+
+    def _index(self, timestamp, ticker, offset):
+        for timestamps, offsets in (self._timestamps, self._offsets), \
+                self._by_ticker.setdefault(ticker, ([], [])):
+            if timestamps and timestamp < timestamps[-1]:
+                self._in_file_order = self._in_file_order and timestamps is not self._timestamps
+                position = bisect.bisect_right(timestamps, timestamp)
+                timestamps.insert(position, timestamp)
+                offsets.insert(position, offset)
+            else:
+                timestamps.append(timestamp)
+                offsets.append(offset)
+
+    @staticmethod
+    def _decode(line: bytes) -> dict:
+        record = json.loads(line)
+        record['timestamp'] = datetime.fromisoformat(record['timestamp'])
+        return record
+
+
+class TestTradeJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "journal.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _fill(self, journal):
+        journal.append({'ticker': "AAPL", 'qty': 1}, timestamp=datetime(2024, 1, 2))
+        journal.append({'ticker': "MSFT", 'qty': 2}, timestamp=datetime(2024, 1, 3))
+        journal.append_many([{'ticker': "AAPL", 'qty': 3}, {'ticker': "MSFT", 'qty': 4}],
+                            timestamp=datetime(2024, 1, 5))
+        journal.append({'ticker': "AAPL", 'qty': 5}, timestamp=datetime(2024, 1, 4))  # late record
+
+    def test_file_is_only_opened_on_first_use(self):
+        journal = TradeJournal(self.path)
+        self.assertFalse(os.path.exists(self.path))
+        journal.append({'ticker': "AAPL", 'qty': 1})
+        journal.close()
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_replay_by_ticker_and_date(self):
+        with TradeJournal(self.path) as journal:
+            self._fill(journal)
+            self.assertEqual([record['qty'] for record in journal.replay()], [1, 2, 5, 3, 4])
+            self.assertEqual([record['qty'] for record in journal.replay("AAPL")], [1, 5, 3])
+            self.assertEqual([record['qty'] for record in journal.replay(start=datetime(2024, 1, 3),
+                                                                         end=datetime(2024, 1, 4))], [2, 5])
+            self.assertEqual([record['qty'] for record in journal.replay("MSFT", start=datetime(2024, 1, 4))], [4])
+            self.assertEqual(list(journal.replay("GOOG")), [])
+            self.assertEqual(next(journal.replay("AAPL"))['timestamp'], datetime(2024, 1, 2))
+
+    def test_reopen_rebuilds_the_index_and_truncates_a_partial_line(self):
+        with TradeJournal(self.path) as journal:
+            self._fill(journal)
+        with open(self.path, 'ab') as file:
+            file.write(b'{"timestamp": "2024-01-06T00:00:00", "tick')  # crash in the middle of a write
+
+        with TradeJournal(self.path) as journal:
+            self.assertEqual(len(journal), 5)
+            self.assertEqual(sorted(journal.tickers()), ["AAPL", "MSFT"])
+            journal.append({'ticker': "MSFT", 'qty': 6}, timestamp=datetime(2024, 1, 6))
+            self.assertEqual([record['qty'] for record in journal.replay("MSFT")], [2, 4, 6])
+        with open(self.path, 'rb') as file:
+            self.assertEqual([json.loads(line)['qty'] for line in file], [1, 2, 3, 4, 5, 6])
+
+    def test_concurrent_appends_keep_the_index_consistent(self):
+        n_threads, n_trades = 4, 500
+
+        def append_trades(worker):
+            for i in range(n_trades):
+                if i % 2:
+                    journal.append({'ticker': f"T{worker}", 'qty': i})
+                else:
+                    journal.append_many([{'ticker': f"T{worker}", 'qty': i}])
+
+        with TradeJournal(self.path) as journal:
+            workers = [threading.Thread(target=append_trades, args=(worker,)) for worker in range(n_threads)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+            self.assertEqual(len(journal), n_threads * n_trades)
+            self.assertEqual(len(set(journal._offsets)), n_threads * n_trades)
+            for worker in range(n_threads):
+                records = list(journal.replay(f"T{worker}"))
+                self.assertEqual({record['ticker'] for record in records}, {f"T{worker}"})
+                self.assertEqual(sorted(record['qty'] for record in records), list(range(n_trades)))
+
+
 class Order:
     def __init__(self, ticker, quantity, order_type, order_status="CREATED", price_limit=None):
-        self.ticker = ticker,
-        self.qty = quantity,
-        self.order_status = order_status,
+        self.ticker = ticker
+        self.qty = quantity
+        self.order_status = order_status
         self.order_type = order_type
         self.price_limit = price_limit
 
 
+"""
+Executing a rebalance of 3,000 names with execute_trade means 3,000 decorated calls, 3,000 log lines and no netting of 
+the orders on the same ticker.
+OrderBlock stores a batch of orders by columns (one NumPy array per field) and TradeExecutionService.execute_batch 
+processes it in one pass: the orders are validated with array operations, netted by ticker (np.unique + np.bincount) 
+and one trade is executed per ticker (a ticker whose orders cancel out is reported as "NETTED"). The batch is logged 
+once, and its trades are written to the journal with a single write.
+"""
+ORDER_TYPES = ("market", "limit")
+
+
+class OrderBlock:
+    def __init__(self, tickers, quantities, order_types, price_limits=None):
+        self.tickers = np.asarray(tickers, dtype=str)
+        self.qty = np.asarray(quantities, dtype=float)
+        self.order_types = np.asarray(order_types, dtype=str)
+        self.price_limits = np.full(len(self.tickers), np.nan) if price_limits is None \
+            else np.asarray([np.nan if limit is None else limit for limit in price_limits], dtype=float)
+        if not len(self.tickers) == len(self.qty) == len(self.order_types) == len(self.price_limits):
+            raise ValueError("All the columns of an OrderBlock must have the same length")
+
+    @classmethod
+    def from_orders(cls, orders):
+        orders = list(orders)
+        return cls([order.ticker for order in orders], [order.qty for order in orders],
+                   [order.order_type for order in orders], [order.price_limit for order in orders])
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def is_valid(self) -> np.ndarray:
+        """Boolean mask of the valid orders: finite non-zero quantity, known type and a price limit for limit orders."""
+        return (np.isfinite(self.qty) & (self.qty != 0) & np.isin(self.order_types, ORDER_TYPES)
+                & ~((self.order_types == "limit") & np.isnan(self.price_limits)))
+
+
+trade_logger = BufferedTradeLogger(log_file='../my_trades.txt')
+trade_journal = TradeJournal(path='../my_trades_journal.jsonl')
+
+
 class TradeExecutionService:
     @staticmethod
-    @TradeLogger(log_file='../my_trades.txt')
+    @trade_logger
+    @trade_journal
     def execute_trade(order: Order):
         # For simplicity, we'll just return a dict of trade details.
         # In reality, the function might communicate with a brokerage API, handle order placement, etc.
@@ -639,8 +1428,86 @@ class TradeExecutionService:
         }
         return trade_details
 
+    @staticmethod
+    @trade_logger
+    def execute_batch(orders):
+        """
+        Execute a batch of orders (an OrderBlock or a list of Order) netted by ticker.
+        Returns {'trades': one trade per ticker with a non-zero net quantity, 'netted': the tickers whose orders cancel
+        out (no trade, trade_status "NETTED"), 'rejected': the invalid orders}. The trades and netted entries are
+        written to the journal.
+        """
+        block = orders if isinstance(orders, OrderBlock) else OrderBlock.from_orders(orders)
+        valid = block.is_valid()
+        rejected = [{'ticker': ticker, 'qty': qty, 'order_type': order_type, 'trade_status': "REJECTED"}
+                    for ticker, qty, order_type in zip(block.tickers[~valid].tolist(), block.qty[~valid].tolist(),
+                                                       block.order_types[~valid].tolist())]
+
+        tickers, position = np.unique(block.tickers[valid], return_inverse=True)
+        net_qty = np.bincount(position, weights=block.qty[valid], minlength=len(tickers))
+        n_orders = np.bincount(position, minlength=len(tickers))
+        # As in execute_trade, the execution itself is simulated at a price of 100
+        netted_trades = [{'ticker': ticker, 'price': 100 if qty != 0 else None, 'qty': qty, 'order_type': "net",
+                          'n_orders': count, 'trade_status': "DONE" if qty != 0 else "NETTED"}
+                         for ticker, qty, count in zip(tickers.tolist(), net_qty.tolist(), n_orders.tolist())]
+        trade_journal.append_many(netted_trades)
+        return {'trades': [trade for trade in netted_trades if trade['trade_status'] == "DONE"],
+                'netted': [trade for trade in netted_trades if trade['trade_status'] == "NETTED"],
+                'rejected': rejected}
+
+
+class TestTradeExecutionService(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.journal = TradeJournal(os.path.join(self.directory.name, "journal.jsonl"))
+        patcher = unittest.mock.patch.dict(globals(), {'trade_journal': self.journal})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.journal.close()
+        self.directory.cleanup()
+
+    def test_orders_are_netted_by_ticker(self):
+        result = TradeExecutionService.execute_batch([Order('FP FP Equity', -1000, "market"),
+                                                      Order('MC FP Equity', 250, "market"),
+                                                      Order('FP FP Equity', 400, "limit", price_limit=99.95)])
+        self.assertEqual([(trade['ticker'], trade['qty'], trade['n_orders']) for trade in result['trades']],
+                         [('FP FP Equity', -600., 2), ('MC FP Equity', 250., 1)])
+        self.assertEqual(result['netted'], [])
+        self.assertEqual(result['rejected'], [])
+        self.assertEqual([record['qty'] for record in self.journal.replay()], [-600., 250.])
+
+    def test_orders_netting_to_zero_are_reported_and_journaled(self):
+        result = TradeExecutionService.execute_batch(OrderBlock(['A', 'A', 'B'], [10, -10, 5], ["market"] * 3))
+        self.assertEqual([trade['ticker'] for trade in result['trades']], ['B'])
+        self.assertEqual(result['netted'], [{'ticker': 'A', 'price': None, 'qty': 0., 'order_type': "net",
+                                             'n_orders': 2, 'trade_status': "NETTED"}])
+        self.assertEqual([record['trade_status'] for record in self.journal.replay('A')], ["NETTED"])
+
+    def test_invalid_orders_are_rejected(self):
+        result = TradeExecutionService.execute_batch(OrderBlock(
+            tickers=['A', 'B', 'C', 'D'], quantities=[0, np.nan, 5, 5],
+            order_types=["market", "market", "limit", "stop"]))
+        self.assertEqual(result['trades'], [])
+        self.assertEqual([order['ticker'] for order in result['rejected']], ['A', 'B', 'C', 'D'])
+        self.assertTrue(all(order['trade_status'] == "REJECTED" for order in result['rejected']))
+        self.assertEqual(len(self.journal), 0)
+
+    def test_empty_batch(self):
+        for orders in ([], OrderBlock([], [], [])):
+            self.assertEqual(TradeExecutionService.execute_batch(orders), {'trades': [], 'netted': [], 'rejected': []})
+        self.assertEqual(len(self.journal), 0)
+
 
 # Executing a trade
 order_0 = Order('FP FP Equity', -1000, "limit", price_limit=99.95)
 trade_details_ex = TradeExecutionService.execute_trade(order_0)
 
+# Executing a batch of orders: the two orders on FP FP Equity are netted, the order without quantity is rejected
+batch_result = TradeExecutionService.execute_batch(OrderBlock(
+    tickers=['FP FP Equity', 'MC FP Equity', 'FP FP Equity', 'AI FP Equity'],
+    quantities=[-1000, 250, 400, 0],
+    order_types=["market", "market", "limit", "market"],
+    price_limits=[None, None, 99.95, None]))
+print(batch_result)
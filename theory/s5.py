@@ -218,6 +218,12 @@ The idea behind lazy loading is that the value for the attribute is only compute
 """
 
 
+import mmap
+import os
+import threading
+import time
+
+
 class LazyProperty:
     def __init__(self, function):
         self.function = function
@@ -242,8 +248,9 @@ class DataProcessor:
             return f.read()
 
 
-processor = DataProcessor(
-    '/Users/benjaminmat/Desktop/Dauphine_OOP_2025_272/theory/additional_ressources/dunder_method_list.txt')
+DUNDER_METHOD_LIST_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'additional_ressources',
+                                       'dunder_method_list.txt')
+processor = DataProcessor(DUNDER_METHOD_LIST_FILE)
 # Data is not loaded yet
 print(processor.data)  # Prints "Loading data..." and then the content
 print(processor.data)  # Prints the content without "Loading data..."
@@ -278,6 +285,183 @@ The key point is that after the first access, the LazyProperty descriptor is eff
 This is why the “Loading data…” message only appears once.
 """
 
+"""
+LazyProperty has three limits:
+    - it is not thread-safe: two threads reading processor.data at the same time can both load the file;
+    - the value can never be invalidated: if processor.filename changes, processor.data still holds the old content;
+    - f.read() copies the whole file in memory, even if only a part of it is used.
+
+CachedProperty below generalizes it:
+    - the value is still stored in the instance __dict__ under the property name, so once computed it is read like a 
+      plain attribute (CachedProperty has no __set__, the instance attribute takes precedence over it);
+    - the computation runs under a per-instance, per-property lock: the other threads wait and get the same value;
+    - CachedProperty.invalidate(obj, name) removes the cached value, it will be computed again on the next access;
+    - depends_on lists the attributes (or other cached properties) the value is computed from. Assigning one of them 
+      invalidates the value, and the invalidation is propagated to the properties depending on it;
+    - on_invalidate is called with the value removed from the cache, to release what it holds (a file, a mapping...).
+      
+DataProcessor.data now memory-maps the file (mmap) instead of reading it: the OS loads the pages when they are read, 
+and data can be sliced like bytes.
+"""
+
+
+_NOT_CACHED = object()
+
+
+class CachedProperty:
+    _LOCKS_ATTRIBUTE = '_cached_property_locks'
+
+    def __init__(self, function=None, depends_on=(), on_invalidate=None):
+        self.function = function
+        self.depends_on = tuple(depends_on)
+        self.on_invalidate = on_invalidate
+        self.name = function.__name__ if function is not None else None
+
+    def __call__(self, function):
+        # used as @CachedProperty(depends_on=(...))
+        self.function = function
+        self.name = function.__name__
+        return self
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        if not self.depends_on:
+            return
+        if '_cached_dependents' not in owner.__dict__:
+            inherited = getattr(owner, '_cached_dependents', {})
+            owner._cached_dependents = {key: set(names) for key, names in inherited.items()}
+            if not inherited:
+                CachedProperty._track_assignments(owner)
+        for dependency in self.depends_on:
+            owner._cached_dependents.setdefault(dependency, set()).add(name)
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        with self._lock(obj, self.name):
+            try:
+                return obj.__dict__[self.name]  # computed by another thread while this one was waiting
+            except KeyError:
+                value = obj.__dict__[self.name] = self.function(obj)
+                return value
+
+    @staticmethod
+    def invalidate(obj, *names):
+        """
+        Remove the cached values of names and of the cached properties depending on them, passing each removed value
+        to the on_invalidate hook of its property.
+        """
+        dependents = getattr(type(obj), '_cached_dependents', {})
+        for name in names:
+            with CachedProperty._lock(obj, name):
+                value = obj.__dict__.pop(name, _NOT_CACHED)
+            CachedProperty.invalidate(obj, *dependents.get(name, ()))
+            descriptor = getattr(type(obj), name, None)
+            if value is not _NOT_CACHED and isinstance(descriptor, CachedProperty) and descriptor.on_invalidate:
+                descriptor.on_invalidate(value)
+
+    @staticmethod
+    def _lock(obj, name):
+        # dict.setdefault is atomic, every thread gets the same lock
+        locks = obj.__dict__.get(CachedProperty._LOCKS_ATTRIBUTE)
+        if locks is None:
+            locks = obj.__dict__.setdefault(CachedProperty._LOCKS_ATTRIBUTE, {})
+        lock = locks.get(name)
+        if lock is None:
+            lock = locks.setdefault(name, threading.RLock())
+        return lock
+
+    @staticmethod
+    def _track_assignments(owner):
+        """Wrap owner.__setattr__ so that assigning a dependency invalidates the cached properties using it."""
+        original_setattr = owner.__setattr__
+
+        def __setattr__(obj, name, value):
+            original_setattr(obj, name, value)
+            if name in type(obj)._cached_dependents:
+                CachedProperty.invalidate(obj, *type(obj)._cached_dependents[name])
+
+        owner.__setattr__ = __setattr__
+
+
+def _close_mapping(data):
+    if isinstance(data, mmap.mmap):
+        data.close()
+
+
+class DataProcessor:
+    def __init__(self, filename):
+        self.filename = filename
+
+    @CachedProperty(depends_on=("filename",), on_invalidate=_close_mapping)
+    def data(self):
+        print("Loading data...")
+        with open(self.filename, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""  # an empty file cannot be memory-mapped
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @CachedProperty(depends_on=("data",))
+    def header(self):
+        end = self.data.find(b"\n")
+        return bytes(self.data[:end if end >= 0 else len(self.data)]).decode()
+
+
+processor = DataProcessor(DUNDER_METHOD_LIST_FILE)
+print(processor.header)  # Prints "Loading data..." and then the first line
+print(processor.data[:100].decode())  # Already loaded
+processor.filename = DUNDER_METHOD_LIST_FILE  # invalidates data and header
+print(processor.header)  # Prints "Loading data..." again
+
+
+class TestCachedProperty(unittest.TestCase):
+    def setUp(self):
+        class Counter:
+            def __init__(self):
+                self.base = 1
+                self.loads = 0
+
+            @CachedProperty(depends_on=("base",))
+            def value(self):
+                self.loads += 1
+                time.sleep(0.01)
+                return self.base * 10
+
+            @CachedProperty(depends_on=("value",))
+            def double(self):
+                return self.value * 2
+
+        self.counter = Counter()
+
+    def test_value_is_computed_once_across_threads(self):
+        threads = [threading.Thread(target=lambda: self.counter.value) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.counter.loads, 1)
+
+    def test_invalidation_propagates_to_dependents(self):
+        self.assertEqual(self.counter.double, 20)
+        self.counter.base = 2
+        self.assertEqual(self.counter.double, 40)
+        self.assertEqual(self.counter.loads, 2)
+        CachedProperty.invalidate(self.counter, "value")
+        self.assertNotIn("double", self.counter.__dict__)
+
+    def test_data_processor_memory_maps_the_file(self):
+        data_processor = DataProcessor(DUNDER_METHOD_LIST_FILE)
+        self.assertIsInstance(data_processor.data, mmap.mmap)
+        with open(DUNDER_METHOD_LIST_FILE, 'rb') as f:
+            self.assertEqual(data_processor.data[:], f.read())
+
+    def test_reassigning_filename_closes_the_old_mapping(self):
+        data_processor = DataProcessor(DUNDER_METHOD_LIST_FILE)
+        old_data = data_processor.data
+        data_processor.filename = DUNDER_METHOD_LIST_FILE
+        self.assertTrue(old_data.closed)
+        self.assertFalse(data_processor.data.closed)
+
 """
 ## Creational Design Patterns in Python
 Creational design patterns provide various object creation mechanisms, which increase flexibility and reuse of existing
@@ -403,17 +587,22 @@ additional financial instrument types as needed, enhancing modularity and scalab
 """
 
 
+from theory.additional_ressources.class_registry import ClassRegistry
+
+
 class FinancialInstrumentFactory:
+    registry = ClassRegistry("financial instrument")
+
     @staticmethod
     def create_financial_instrument(instrument_type, **kwargs):
-        if instrument_type.lower() == "stock":
-            return StockFactoryExample(**kwargs)
-        elif instrument_type.lower() == "bond":
-            return BondFactoryExample(**kwargs)
-        else:
-            raise ValueError("Invalid financial instrument type")
+        return FinancialInstrumentFactory.registry.create(instrument_type, **kwargs)
 
+    @staticmethod
+    def create_financial_instruments(specs, type_key='instrument_type'):
+        return FinancialInstrumentFactory.registry.create_many(specs, type_key=type_key)
 
+
+@FinancialInstrumentFactory.registry.register("stock")
 class StockFactoryExample:
     def __init__(self, ticker, price):
         self.ticker = ticker
@@ -423,6 +612,7 @@ class StockFactoryExample:
         return f"The market value of {self.ticker} is ${self.price} per share."
 
 
+@FinancialInstrumentFactory.registry.register("bond")
 class BondFactoryExample:
     def __init__(self, issuer, face_value):
         self.issuer = issuer
@@ -439,3 +629,21 @@ print(stock.get_market_value())  # Output: The market value of AAPL is $150 per
 # Create a Bond
 bond = FinancialInstrumentFactory.create_financial_instrument("bond", issuer="US Government", face_value=1000)
 print(bond.get_face_value())  # Output: The face value of bond issued by US Government is $1000.
+
+"""
+The if/elif chain of a factory compares strings on every creation and has to be edited for every new type. With a 
+registry (theory/additional_ressources/class_registry.py) each class registers itself with a decorator and the 
+factory only does a dict lookup. A new instrument type is added without touching the factory:
+
+    @FinancialInstrumentFactory.registry.register("option")
+    class OptionFactoryExample:
+        ...
+
+When many instruments are created at once (e.g. from reference data), create_financial_instruments groups the specs by 
+type, resolves each class once and builds each group in one call when the class defines create_batch.
+"""
+instruments = FinancialInstrumentFactory.create_financial_instruments([
+    {'instrument_type': "stock", 'ticker': "AAPL", 'price': 150},
+    {'instrument_type': "bond", 'issuer': "US Government", 'face_value': 1000},
+    {'instrument_type': "stock", 'ticker': "MSFT", 'price': 400}])
+print(instruments)
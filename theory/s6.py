@@ -243,10 +243,17 @@ The Role of __init__.py
 Initializing package-level resources example:
 """
 
+import atexit
+import copy
 import logging
 import os
+import queue
+import tempfile
+import threading
+import unittest
+import unittest.mock
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 DEFAULT_LOG_FILE = os.getenv("MY_PACKAGE_LOG_FILE", str(Path.cwd() / "my_package_log.txt"))
 
@@ -257,44 +264,181 @@ _formatter = logging.Formatter(
     "%(asctime)s | %(levelname)-8s | %(name)s | %(filename)s:%(lineno)d | %(message)s"
 )
 
-def _add_file_handler(log_file: str):
-    """Attach a rotating file handler if not already present for this file."""
+_init_lock = threading.Lock()
+_listener = None
+_initialized = False
+
+class _MessageOnlyQueueHandler(QueueHandler):
+    """
+    QueueHandler.prepare() runs the full formatter (date, layout, traceback) in the calling thread before queuing the
+    record. Here only the message is merged with its arguments in the calling thread, so the log shows the values the
+    arguments had when the call was made even if the caller changes them afterwards (dict, array, ...). The handlers
+    of the listener thread do the formatting and the writes.
+    """
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+def _add_file_handler(log_file: str, handlers: list):
+    """Add a rotating file handler to handlers if not already present for this file."""
     abs_target = os.path.abspath(log_file)
-    for h in logger.handlers:
+    for h in handlers:
         if isinstance(h, RotatingFileHandler) and getattr(h, "baseFilename", "") == abs_target:
             return  # already attached for this file
 
     Path(abs_target).parent.mkdir(parents=True, exist_ok=True)
     fh = RotatingFileHandler(abs_target, maxBytes=1_000_000, backupCount=5, encoding="utf-8")
     fh.setFormatter(_formatter)
-    logger.addHandler(fh)
+    handlers.append(fh)
 
-def _add_console_handler():
-    """Attach one console handler (optional; nice during dev)."""
+def _add_console_handler(handlers: list):
+    """Add one console handler (optional; nice during dev)."""
     if not any(isinstance(h, logging.StreamHandler) and not isinstance(h, RotatingFileHandler)
-               for h in logger.handlers):
+               for h in handlers):
         ch = logging.StreamHandler()
         ch.setFormatter(_formatter)
-        logger.addHandler(ch)
+        handlers.append(ch)
+
+def _detach_handlers() -> list:
+    """Stop the queue listener (writing the queued records) and remove the handlers from the logger."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        handlers = list(_listener.handlers)
+        _listener = None
+    else:
+        handlers = [h for h in logger.handlers if not isinstance(h, QueueHandler)]
+    for h in list(logger.handlers):
+        logger.removeHandler(h)
+    return handlers
 
 # Initialize package-wide configurations
 CONFIG = {
     "PACKAGE_VERSION": "v1",
 }
 
-def initialize(log_file: str = DEFAULT_LOG_FILE, console: bool = True):
+def initialize(log_file: str = DEFAULT_LOG_FILE, console: bool = True, use_queue: bool = True):
     """
     Initialize logging to a rotating .txt file (and optionally console).
     You can override the file path here or via the MY_PACKAGE_LOG_FILE env var.
+
+    With use_queue=True (default) the logger only gets a _MessageOnlyQueueHandler: a log call builds the message, puts
+    the record in a queue and returns, a QueueListener thread formats it and writes it to the file / console. The
+    calling code (e.g. a pricing loop) never waits on the disk. With use_queue=False the handlers are attached to the logger
+    and every call formats and writes in the caller's thread.
     """
-    _add_file_handler(log_file)
-    if console:
-        _add_console_handler()
-    logger.info(f"Initializing my_package {__name__}")
+    global _listener, _initialized
+    with _init_lock:
+        handlers = _detach_handlers()
+        _add_file_handler(log_file, handlers)
+        if console:
+            _add_console_handler(handlers)
+
+        if use_queue:
+            log_queue = queue.SimpleQueue()
+            logger.addHandler(_MessageOnlyQueueHandler(log_queue))
+            _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+            _listener.start()
+        else:
+            for h in handlers:
+                logger.addHandler(h)
+        if not _initialized:
+            atexit.register(shutdown)
+        _initialized = True
+    logger.info("Initializing my_package %s", __name__)
     # Perform any startup tasks here
 
-# Call initialize on import if you want immediate file logging:
-initialize()
+def get_logger() -> logging.Logger:
+    """Package logger, initialized with the default settings on first use (nothing is done at import time)."""
+    if not _initialized:
+        initialize()
+    return logger
+
+def shutdown():
+    """Write the queued records, then close and remove the handlers. Registered with atexit by initialize()."""
+    global _initialized
+    with _init_lock:
+        for h in _detach_handlers():
+            h.close()
+        if _initialized:
+            atexit.unregister(shutdown)
+        _initialized = False
+
+class TestPackageLogging(unittest.TestCase):
+    def setUp(self):
+        shutdown()
+        self.directory = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.directory.name, "my_package_log.txt")
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(shutdown)
+
+    def _logged_lines(self, log_file=None):
+        with open(log_file or self.log_file, encoding="utf-8") as file:
+            return file.readlines()
+
+    def test_queue_mode_logs_the_values_of_the_call(self):
+        initialize(self.log_file, console=False)
+        self.assertEqual([type(h) for h in logger.handlers], [_MessageOnlyQueueHandler])
+        prices = {'AAPL': 150}
+        logger.info("prices %s", prices)
+        prices['AAPL'] = 151
+        shutdown()
+        self.assertIn("prices {'AAPL': 150}", self._logged_lines()[-1])
+
+    def test_queue_mode_logs_exceptions(self):
+        initialize(self.log_file, console=False)
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.exception("pricing failed")
+        shutdown()
+        lines = "".join(self._logged_lines())
+        self.assertIn("pricing failed", lines)
+        self.assertIn("ZeroDivisionError", lines)
+
+    def test_get_logger_initializes_on_first_use(self):
+        calls = []
+        real_initialize = initialize
+
+        def initialize_in_tmp():
+            calls.append(1)
+            real_initialize(self.log_file, console=False)
+
+        self.assertFalse(_initialized)
+        with unittest.mock.patch.dict(globals(), {'initialize': initialize_in_tmp}):
+            self.assertIs(get_logger(), logger)
+            self.assertIs(get_logger(), logger)
+        self.assertEqual(calls, [1])
+
+    def test_initialize_again_does_not_duplicate_the_handlers(self):
+        initialize(self.log_file, console=False)
+        initialize(self.log_file, console=False)
+        self.assertEqual(len(logger.handlers), 1)
+        self.assertEqual(len(_listener.handlers), 1)
+
+        initialize(self.log_file, console=False, use_queue=False)
+        self.assertEqual([type(h) for h in logger.handlers], [RotatingFileHandler])
+        logger.info("direct write")
+        self.assertEqual(len(self._logged_lines()), 4)  # one "Initializing" line per initialize() call
+        self.assertIn("direct write", self._logged_lines()[-1])
+
+    def test_shutdown_writes_the_queued_records(self):
+        initialize(self.log_file, console=False)
+        for i in range(1000):
+            logger.info("tick %d", i)
+        shutdown()
+        lines = self._logged_lines()
+        self.assertEqual(len(lines), 1001)
+        self.assertIn("tick 999", lines[-1])
+        self.assertEqual(logger.handlers, [])
+        self.assertFalse(_initialized)
+
+def run_tests():
+    unittest.main(argv=[''], verbosity=2, exit=False)
+
+# Nothing is initialized on import: call initialize() to choose the settings, or get_logger() for the defaults.
 
 
 """
@@ -643,3 +787,7 @@ To make running tests easier, you can add a script to your pyproject.toml:
 Now you can run tests with:    
     poetry run test
 """
+
+
+if __name__ == "__main__":
+    run_tests()